@@ -1,53 +1,110 @@
 import os
+import re
 import cv2
+import time
 import base64
+import logging
+import threading
 import numpy as np
-import fitz  # PyMuPDF for PDF handling
-from flask import Flask, request, session, redirect, jsonify
+from flask import Flask, request, session, redirect, jsonify, g
 
 # --- IMPORT SERVICES ---
 # Ensure you have services/ocr_service.py and services/face_service.py
-from services.ocr_service import extract_aadhaar_text, extract_pan_text
-from services.face_service import verify_face_match
+from services.document_service import process_documents
+from services.face_service import verify_against_document, prime_document_face
+from services.jobs import submit_job, get_job
+from services.upload_store import UPLOAD_FOLDER, ingest_upload
+from services.image_preprocess import SELFIE_MAX_SIDE, fit_max_side
+from services import risk_model
+from services.risk_model import predict_risk
+from services.aadhaar_validator import validate_aadhaar_number
+from rapidfuzz import fuzz
+from services import face_engine
+from services.session_store import ServerSideSessionInterface, create_store
+from services import metrics
+from services.metrics import timed
+from utils.request_log import configure_logging, new_request_id, request_id_var
+
+configure_logging()
+log = logging.getLogger("kyc")
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "secure-kyc-key-999"
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB Max
 
-# Upload Config
-UPLOAD_FOLDER = 'static/uploads'
+# Session data (user details, OCR results, face cache key) lives server-side;
+# the cookie only carries an opaque session id.
+app.session_interface = ServerSideSessionInterface(create_store())
+
+# Upload Config (files are stored by content hash, see services/upload_store.py)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# --- HELPER: CONVERT PDF TO IMAGE ---
-def convert_pdf_to_image(file_storage, save_path):
+# Heavy engines (TensorFlow face model, risk model) are never imported on the request
+# path of the form pages. Each worker warms them in a background thread instead;
+# /readyz reports 503 until that finishes so the load balancer skips cold workers.
+# FACE_WARMUP=0 skips the warm-up (engines then load lazily on first use).
+WARMUP_ENABLED = os.environ.get("FACE_WARMUP", "1") != "0"
+
+# Set by gunicorn.conf.py when the app is imported once in the master and forked:
+# threads do not survive fork, so the warm-up is started per worker from post_fork.
+PRELOADED = os.environ.get("KYC_PRELOADED") == "1"
+
+def _warm_up_engines():
+    try:
+        risk_model.get_model()
+        face_engine.load_engine()
+    except Exception:
+        # /readyz stays 503: make the cause visible instead of dying silently
+        log.exception("❌ Engine warm-up failed")
+
+def start_warmup():
+    if WARMUP_ENABLED:
+        threading.Thread(target=_warm_up_engines, name="engine-warmup", daemon=True).start()
+
+def preload_models(face=False):
     """
-    If file is PDF, converts first page to Image.
-    If file is Image, saves it directly.
+    Loads models in the gunicorn master before fork, so workers share the pages.
+    The face model only on request: TensorFlow is not fork-safe.
     """
-    filename = file_storage.filename.lower()
-    
-    # CASE 1: PDF FILE
-    if filename.endswith('.pdf'):
-        doc = fitz.open(stream=file_storage.read(), filetype="pdf")
-        page = doc.load_page(0)  # Get first page
-        pix = page.get_pixmap()  # Render to image
-        
-        img_data = np.frombuffer(pix.samples, dtype=np.uint8)
-        img_np = img_data.reshape(pix.h, pix.w, pix.n)
-        
-        if pix.n == 3:
-            img_np = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-        elif pix.n == 4: # RGBA
-            img_np = cv2.cvtColor(img_np, cv2.COLOR_RGBA2BGR)
-            
-        final_path = save_path.replace(".pdf", ".jpg")
-        cv2.imwrite(final_path, img_np)
-        return img_np, final_path
-
-    # CASE 2: NORMAL IMAGE
-    else:
-        file_storage.save(save_path)
-        return cv2.imread(save_path), save_path
+    risk_model.get_model()
+    if face:
+        face_engine.load_engine()
+
+# Spawned OCR processes re-run the main script as __mp_main__ when the app is
+# started with `python app.py`; they must not load the face and risk models.
+if not PRELOADED and __name__ != "__mp_main__":
+    start_warmup()
+
+# --- REQUEST IDS + LATENCY ---
+# Incoming X-Request-ID is reused (e.g. set by the load balancer) if it looks sane
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+@app.before_request
+def _start_request():
+    incoming = request.headers.get("X-Request-ID", "")
+    g.request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else new_request_id()
+    g.request_id_token = request_id_var.set(g.request_id)
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _finish_request(response):
+    elapsed = time.perf_counter() - g.get("request_start", time.perf_counter())
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+
+    metrics.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    response.headers["X-Request-ID"] = g.get("request_id", "-")
+
+    # /metrics and health probes are scraped constantly; keep them out of the log
+    if endpoint not in ("/metrics", "/healthz", "/readyz"):
+        log.info("method=%s path=%s status=%s duration_ms=%.1f",
+                 request.method, endpoint, response.status_code, elapsed * 1000)
+    return response
+
+@app.teardown_request
+def _reset_request_id(exc):
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        request_id_var.reset(token)
 
 # --- CSS STYLES (Modern UI + Loader) ---
 MODERN_CSS = """
@@ -169,12 +226,52 @@ def upload():
                 document.getElementById('submitBtn').disabled = true;
                 document.getElementById('submitBtn').innerText = "Processing...";
             }}
+
+            function showErrors(errors) {{
+                document.getElementById('loader').style.display = 'none';
+                const box = document.getElementById('error-box');
+                box.innerHTML = '';
+                errors.forEach(e => {{
+                    const p = document.createElement('p');
+                    p.style.color = 'red';
+                    p.style.margin = '5px 0';
+                    p.textContent = e;
+                    box.appendChild(p);
+                }});
+                document.getElementById('upload-card').style.display = 'none';
+                document.getElementById('error-card').style.display = 'block';
+            }}
+
+            // Submit in the background, then poll the OCR job until it finishes
+            async function submitDocs(event) {{
+                event.preventDefault();
+                showLoader();
+
+                const resp = await fetch('/upload', {{ method: 'POST', body: new FormData(event.target) }});
+                const job = await resp.json();
+                if (!resp.ok) return showErrors([job.error || 'Upload failed.']);
+
+                while (true) {{
+                    await new Promise(r => setTimeout(r, 1000));
+                    const poll = await fetch('/jobs/' + job.job_id);
+                    const status = await poll.json();
+
+                    if (status.status === 'done') {{
+                        if (status.errors.length) return showErrors(status.errors);
+                        window.location = status.next;
+                        return;
+                    }}
+                    if (status.status === 'failed' || !poll.ok) {{
+                        return showErrors(['❌ ' + (status.error || 'Processing failed.')]);
+                    }}
+                }}
+            }}
         </script>
 
-        <div class="card">
+        <div class="card" id="upload-card">
             <h2>📂 Upload Documents</h2>
             <p>Accepted: JPG, PNG, PDF</p>
-            <form method="post" enctype="multipart/form-data" onsubmit="showLoader()">
+            <form method="post" enctype="multipart/form-data" onsubmit="submitDocs(event)">
                 <label style="float:left; font-weight:600">Aadhaar Card (Front)</label>
                 <input type="file" name="aadhaar" accept="image/*,application/pdf" required>
                 
@@ -184,69 +281,64 @@ def upload():
                 <button type="submit" class="btn" id="submitBtn">Verify Docs ➜</button>
             </form>
         </div>
+
+        <div class="card" id="error-card" style="display:none;">
+            <h2 style="color:#e53e3e">Verification Failed</h2>
+            <div class="status-box" id="error-box" style="background:#f8d7da; border:1px solid #f5c6cb;"></div>
+            <a href='/upload' class='btn' style='background:#718096; display:inline-block; text-decoration:none;'>Try Again</a>
+        </div>
         """
 
     user = session["user"]
-    errors = []
     
-    # 1. PROCESS AADHAAR
+    # 1. READ UPLOADS INTO MEMORY (decoded from the buffer; saving to disk happens in the background)
     f_aadhaar = request.files.get("aadhaar")
-    if not f_aadhaar: return "Missing Aadhaar", 400
-    
-    save_path_a = os.path.join(UPLOAD_FOLDER, f"aadhaar_{f_aadhaar.filename}")
+    if not f_aadhaar or f_aadhaar.filename == '':
+        return jsonify({"error": "Missing Aadhaar"}), 400
     
+    f_pan = request.files.get("pan")
+    upload_p = None
     try:
-        img_a, real_path_a = convert_pdf_to_image(f_aadhaar, save_path_a)
-        
-        # OCR
-        ocr_aadhaar = extract_aadhaar_text(img_a)
-        
-        if not ocr_aadhaar["aadhaar_number"]:
-            errors.append("❌ Could not read Aadhaar Number.")
-        elif ocr_aadhaar["aadhaar_number"][-4:] != user["aadhaar_last4"]:
-            errors.append(f"❌ Aadhaar Mismatch: Found ...{ocr_aadhaar['aadhaar_number'][-4:]}")
-            
-        session["doc_path_for_face"] = real_path_a
+        upload_a = ingest_upload(f_aadhaar)
+        if f_pan and f_pan.filename != '':
+            upload_p = ingest_upload(f_pan)
+    except ValueError as e:
+        return jsonify({"error": f"❌ {e}"}), 400
+
+    # 2. QUEUE OCR JOB
+    job_id = submit_job(process_documents, user, upload_a, upload_p)
+    session["upload_job"] = job_id
+    
+    return jsonify({"job_id": job_id}), 202
 
-    except Exception as e:
-        errors.append(f"❌ Error processing Aadhaar: {str(e)}")
-        ocr_aadhaar = {}
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    # Only the session that queued the job may read its result
+    if session.get("upload_job") != job_id:
+        return jsonify({"status": "unknown", "error": "Unknown job"}), 404
 
-    # 2. PROCESS PAN
-    f_pan = request.files.get("pan")
-    ocr_pan = {"status": "SKIPPED", "pan_number": None} 
-    
-    if f_pan and f_pan.filename != '':
-        save_path_p = os.path.join(UPLOAD_FOLDER, f"pan_{f_pan.filename}")
-        try:
-            img_p, _ = convert_pdf_to_image(f_pan, save_path_p)
-            ocr_pan = extract_pan_text(img_p)
-            
-            if user["pan_number"]:
-                 if not ocr_pan["pan_number"]:
-                     errors.append("❌ Uploaded PAN but could not read number.")
-                 elif ocr_pan["pan_number"] != user["pan_number"]:
-                     errors.append(f"❌ PAN Mismatch: Found {ocr_pan['pan_number']}")
-        except Exception as e:
-            errors.append(f"❌ Error processing PAN: {str(e)}")
-
-    if errors:
-        error_html = "".join([f"<p style='color:red; margin:5px 0;'>{e}</p>" for e in errors])
-        return f"""
-        {MODERN_CSS}
-        <div class="card">
-            <h2 style="color:#e53e3e">Verification Failed</h2>
-            <div class="status-box" style="background:#f8d7da; border:1px solid #f5c6cb;">
-                {error_html}
-            </div>
-            <a href='/upload' class='btn' style='background:#718096; display:inline-block; text-decoration:none;'>Try Again</a>
-        </div>
-        """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"status": "unknown", "error": "Job expired. Please upload again."}), 404
 
-    session["ocr_aadhaar"] = ocr_aadhaar
-    session["ocr_pan"] = ocr_pan
-    
-    return redirect("/face-verify")
+    if job["status"] != "done":
+        return jsonify(job)
+
+    result = job["result"]
+    if result["errors"]:
+        return jsonify({"status": "done", "errors": result["errors"]})
+
+    # First poll that sees the finished job stores it for the next pages
+    if session.get("finished_job") != job_id:
+        session["finished_job"] = job_id
+        session["ocr_aadhaar"] = result["ocr_aadhaar"]
+        session["ocr_pan"] = result["ocr_pan"]
+        session["doc_path_for_face"] = result["doc_path_for_face"]
+
+        # Embed ID-card face once, in the background (selfie retries reuse it)
+        session["doc_face_key"] = prime_document_face(result["doc_path_for_face"])
+
+    return jsonify({"status": "done", "errors": [], "next": "/face-verify"})
 
 @app.route("/face-verify", methods=["GET"])
 def face_verify_page():
@@ -281,7 +373,7 @@ def face_verify_page():
 
         <div id="section-upload" style="display:none;">
             <div style="border: 2px dashed #cbd5e0; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                <form id="face-form-upload" method="post" action="/process-face" enctype="multipart/form-data" onsubmit="showLoader()">
+                <form id="face-form-upload" method="post" action="/process-face" enctype="multipart/form-data" onsubmit="uploadSelfie(event)">
                     <label style="float:none;">Upload Your Selfie/Photo</label>
                     <input type="file" name="user_photo" accept="image/*" required>
                     <input type="hidden" name="source_type" value="upload">
@@ -290,17 +382,16 @@ def face_verify_page():
             </div>
         </div>
 
-        <form id="face-form-cam" method="post" action="/process-face" style="display:none;">
-            <input type="hidden" name="image_data" id="image-data">
-            <input type="hidden" name="source_type" value="webcam">
-        </form>
-
         <script>
             // --- GLOBAL VARIABLES ---
             let video = document.getElementById('video');
             let canvas = document.getElementById('canvas');
             let stream = null;
 
+            // Frames are downsized in the browser to what the face model can use
+            const SELFIE_MAX_SIDE = {SELFIE_MAX_SIDE};
+            const SELFIE_QUALITY = 0.85;
+
             // --- TAB LOGIC ---
             function switchTab(tab) {{
                 if(tab === 'camera') {{
@@ -357,22 +448,58 @@ def face_verify_page():
                 }}
             }}
 
-            function captureAndVerify() {{
+            // --- SELFIE UPLOAD (binary JPEG body, no base64) ---
+            function toSelfieBlob(source, width, height) {{
+                const scale = Math.min(1, SELFIE_MAX_SIDE / Math.max(width, height));
+                canvas.width = Math.round(width * scale);
+                canvas.height = Math.round(height * scale);
+                canvas.getContext('2d').drawImage(source, 0, 0, canvas.width, canvas.height);
+                return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', SELFIE_QUALITY));
+            }}
+
+            async function sendSelfie(blob, sourceType) {{
+                showLoader();
+                try {{
+                    const response = await fetch('/process-face', {{
+                        method: 'POST',
+                        headers: {{ 'Content-Type': 'image/jpeg', 'X-Selfie-Source': sourceType }},
+                        body: blob
+                    }});
+                    // The result page replaces this one, as a normal form post would
+                    const html = await response.text();
+                    document.open();
+                    document.write(html);
+                    document.close();
+                }} catch (err) {{
+                    document.getElementById('loader').style.display = 'none';
+                    alert("Upload failed: " + err.message);
+                }}
+            }}
+
+            async function captureAndVerify() {{
                 if (!stream) return;
-                
-                const context = canvas.getContext('2d');
-                canvas.width = video.videoWidth;
-                canvas.height = video.videoHeight;
-                context.drawImage(video, 0, 0);
-                
-                const dataURL = canvas.toDataURL('image/jpeg', 0.8);
-                document.getElementById('image-data').value = dataURL;
 
-                // Show Loader
-                document.getElementById('loader').style.display = 'flex';
-                
-                // Submit Form
-                document.getElementById('face-form-cam').submit();
+                const blob = await toSelfieBlob(video, video.videoWidth, video.videoHeight);
+                await sendSelfie(blob, 'webcam');
+            }}
+
+            async function uploadSelfie(event) {{
+                const form = event.target;
+                const file = form.user_photo.files[0];
+                if (!file) return;
+
+                event.preventDefault();
+                let blob = null;
+                try {{
+                    const bitmap = await createImageBitmap(file, {{ imageOrientation: 'from-image' }});
+                    blob = await toSelfieBlob(bitmap, bitmap.width, bitmap.height);
+                }} catch (err) {{
+                    // Formats the browser cannot decode (e.g. HEIC) go up unchanged
+                    showLoader();
+                    form.submit();
+                    return;
+                }}
+                await sendSelfie(blob, 'upload');
             }}
             
             function showLoader() {{
@@ -385,30 +512,54 @@ def face_verify_page():
     </div>
     """
 
+# Raw selfie bodies posted by the face-verify page
+SELFIE_MIMETYPES = ("image/jpeg", "image/png", "image/webp")
+
+def name_match_score(user, ocr_aadhaar):
+    """
+    Fuzzy match of the entered name against the card text. An ROI hit's full_text
+    is only the digit band, so its name_text (the name lines) is used instead.
+    """
+    card_text = ocr_aadhaar.get("name_text") or ocr_aadhaar.get("full_text", "")
+    return fuzz.partial_ratio(user.get("name", "").upper(), card_text.upper())
+
 @app.route("/process-face", methods=["POST"])
 def process_face():
     if "doc_path_for_face" not in session: return redirect("/")
 
     img_live = None
-    source_type = request.form.get("source_type")
-    
+    data = None
+
     # --- HANDLE IMAGE SOURCE ---
     try:
-        if source_type == "webcam":
-            data_url = request.form.get("image_data")
-            if not data_url: return "No image captured", 400
-            
-            encoded_data = data_url.split(',')[1]
-            nparr = np.frombuffer(base64.b64decode(encoded_data), np.uint8)
-            img_live = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        elif source_type == "upload":
-            f_photo = request.files.get("user_photo")
-            if not f_photo: return "No file uploaded", 400
-
-            photo_path = os.path.join(UPLOAD_FOLDER, "temp_user_photo.jpg")
-            f_photo.save(photo_path)
-            img_live = cv2.imread(photo_path)
+        if request.mimetype in SELFIE_MIMETYPES:
+            # Binary body from the face-verify page: one read of the stream, no form parsing or base64
+            source_type = request.headers.get("X-Selfie-Source", "webcam")
+            if source_type not in ("webcam", "upload"): source_type = "webcam"
+            data = request.get_data(cache=False)
+            if not data: return "No image captured", 400
+
+        else:
+            source_type = request.form.get("source_type")
+
+            if source_type == "webcam":
+                # Legacy data-URL post (pages rendered before the binary upload)
+                data_url = request.form.get("image_data")
+                if not data_url: return "No image captured", 400
+                data = base64.b64decode(data_url.split(',')[1])
+
+            elif source_type == "upload":
+                # Multipart fallback for formats the browser could not re-encode
+                f_photo = request.files.get("user_photo")
+                if not f_photo: return "No file uploaded", 400
+                data = f_photo.read()
+
+        if data is not None:
+            # Decode in memory: a shared temp file would race between concurrent users
+            with timed("selfie_decode", "selfie"):
+                img_live = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                if img_live is not None:
+                    img_live = fit_max_side(img_live, SELFIE_MAX_SIDE)
 
     except Exception as e:
         return f"Error processing image: {str(e)}", 400
@@ -416,15 +567,27 @@ def process_face():
     if img_live is None:
         return "Could not load image. Please try again.", 400
 
-    # Load ID Card Image
-    img_doc_path = session["doc_path_for_face"]
-    img_doc = cv2.imread(img_doc_path)
-    
     # --- CALL FACE VERIFICATION ---
+    # ID-card embedding comes from the upload-time cache; only the selfie is embedded here
     try:
-        face_result = verify_face_match(img_doc, img_live)
+        face_result = verify_against_document(
+            session.get("doc_face_key"), session["doc_path_for_face"], img_live
+        )
     except Exception as face_error:
         return f"Face verification failed: {str(face_error)}", 500
+
+    # Unusable selfie (no face, blurry, dark...): ask for another one, nothing was scored
+    if face_result.get("quality_issue"):
+        return f"""
+        {MODERN_CSS}
+        <div class="card" style="max-width:550px;">
+            <h2 style="color:#dd6b20">📸 Please Retake Your Photo</h2>
+            <div class="status-box" style="background:#fffaf0; border:1px solid #fbd38d;">
+                <p>{face_result['error']}</p>
+            </div>
+            <a href="/face-verify" class="btn" style="display:inline-block; text-decoration:none;">Try Again</a>
+        </div>
+        """, 422
     
     # Prepare Result Page
     is_approved = face_result["match"]
@@ -435,6 +598,17 @@ def process_face():
     ocr_pan = session.get("ocr_pan", {})
     user = session.get("user", {})
 
+    # --- RISK SCORING ---
+    # blur_score was measured once during upload preprocessing
+    with timed("risk_score", "aadhaar"):
+        name_score = name_match_score(user, ocr_aadhaar)
+        risk_score = predict_risk(
+            face_result["score"],
+            name_score,
+            validate_aadhaar_number(ocr_aadhaar.get("aadhaar_number")),
+            ocr_aadhaar.get("blur_score", 0)
+        )
+
     return f"""
     {MODERN_CSS}
     <div class="card" style="max-width:550px;">
@@ -458,11 +632,34 @@ def process_face():
             <p><strong>PAN:</strong> {ocr_pan.get('pan_number') if ocr_pan.get('pan_number') else 'Not Provided'}</p>
         </div>
         
+        <div class="status-box" style="background:#f7fafc; border:1px solid #e2e8f0;">
+            <h3 style="margin-top:0;">3. Risk Assessment</h3>
+            
+            <p><strong>Risk Score:</strong> {round(risk_score, 1)} / 100</p>
+            <p><strong>Document Sharpness:</strong> {round(ocr_aadhaar.get('blur_score', 0), 1)}</p>
+        </div>
+        
         <br>
         <a href="/" class="btn" style="background:#2d3748;">Start New KYC</a>
     </div>
     """
 
+# --- HEALTH CHECKS ---
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    if WARMUP_ENABLED and not face_engine.is_ready():
+        return jsonify({"status": "warming_up"}), 503
+    return jsonify({"status": "ready"})
+
+# --- METRICS (Prometheus text format; one registry per worker process) ---
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return metrics.render_latest(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
 if __name__ == "__main__":
     # Host='0.0.0.0' makes it accessible on network (e.g. from phone)
     app.run(debug=True, port=5000, host='0.0.0.0')
@@ -0,0 +1,179 @@
+"""
+Latency, memory, load time and accuracy of the registered face backends.
+
+Every model/detector combination runs in a fresh interpreter (so load time
+and memory are not polluted by the previous backend). It loads the engine,
+embeds every image of a labelled pair set once, and scores the pairs:
+
+    pairs.csv   img1,img2,same     (paths relative to the CSV; same = 1 / 0)
+
+Reported per backend: load seconds, RSS after load and peak RSS, embed
+latency p50/p95 (CPU), and FAR / FRR at the model's default threshold plus
+the FRR at the threshold that meets --target-far. Pick the smallest backend
+that meets the FAR/FRR target, then set FACE_MODEL / FACE_DETECTOR (and
+FACE_COSINE_THRESHOLD if the chosen threshold differs from the default).
+
+Usage (from the repo root):
+    python -m bench.bench_face_backends --pairs data/pairs.csv
+    python -m bench.bench_face_backends --pairs data/pairs.csv --models Facenet512,SFace --detectors opencv,retinaface --out faces.json
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+import numpy as np
+
+from services.face_engine import FACE_MODELS, resolve_backend
+
+PROBE = r"""
+import os, sys, csv, json, time
+import numpy as np
+import cv2
+
+def rss_kb(field):
+    with open("/proc/self/status") as fh:
+        return int(fh.read().split(field + ":")[1].split()[0])
+
+pairs_path = sys.argv[1]
+base = os.path.dirname(os.path.abspath(pairs_path))
+with open(pairs_path, newline="") as fh:
+    pairs = [(row["img1"], row["img2"], int(row["same"])) for row in csv.DictReader(fh)]
+
+from services import face_engine
+
+start = time.perf_counter()
+face_engine.load_engine()
+load_seconds = time.perf_counter() - start
+rss_after_load = rss_kb("VmRSS")
+
+embeddings, latencies = {}, []
+for name in sorted({p for a, b, _ in pairs for p in (a, b)}):
+    image = cv2.imread(os.path.join(base, name))
+    if image is None:
+        continue
+    start = time.perf_counter()
+    embeddings[name] = face_engine.embed(image)
+    latencies.append((time.perf_counter() - start) * 1000)
+
+scored = []
+for a, b, same in pairs:
+    if a in embeddings and b in embeddings:
+        scored.append((face_engine.compare(embeddings[a], embeddings[b])[1], same))
+
+print(json.dumps({
+    "model": face_engine.MODEL_NAME,
+    "detector": face_engine.DETECTOR_BACKEND,
+    "threshold": face_engine.COSINE_THRESHOLD,
+    "load_seconds": load_seconds,
+    "rss_after_load_mb": rss_after_load / 1024,
+    "peak_rss_mb": rss_kb("VmHWM") / 1024,
+    "latencies_ms": latencies,
+    "scored": scored,
+}))
+"""
+
+
+def error_rates(scored, threshold):
+    """
+    FAR = impostor pairs accepted, FRR = genuine pairs rejected, at `threshold`.
+    """
+    genuine = [d for d, same in scored if same]
+    impostor = [d for d, same in scored if not same]
+    far = sum(d <= threshold for d in impostor) / len(impostor) if impostor else None
+    frr = sum(d > threshold for d in genuine) / len(genuine) if genuine else None
+    return far, frr
+
+
+def threshold_for_far(scored, target_far):
+    """
+    Largest threshold whose FAR stays <= target_far (thresholds at observed distances).
+    """
+    impostor = sorted(d for d, same in scored if not same)
+    if not impostor:
+        return None
+
+    allowed = int(target_far * len(impostor))
+    # Accepting `allowed` impostors at most: stay just below the next impostor distance
+    if allowed >= len(impostor):
+        return float(impostor[-1])
+    return float(np.nextafter(impostor[allowed], -np.inf))
+
+
+def summarise(raw, target_far):
+    latencies = np.asarray(raw.pop("latencies_ms"), dtype=np.float64)
+    scored = [tuple(pair) for pair in raw.pop("scored")]
+
+    far, frr = error_rates(scored, raw["threshold"])
+    tuned = threshold_for_far(scored, target_far)
+    tuned_far, tuned_frr = error_rates(scored, tuned) if tuned is not None else (None, None)
+
+    raw.update({
+        "weights_mb": FACE_MODELS[raw["model"]]["weights_mb"],
+        "images": int(latencies.size),
+        "pairs": len(scored),
+        "embed_p50_ms": float(np.percentile(latencies, 50)) if latencies.size else None,
+        "embed_p95_ms": float(np.percentile(latencies, 95)) if latencies.size else None,
+        "far": far,
+        "frr": frr,
+        "tuned_threshold": tuned,
+        "tuned_far": tuned_far,
+        "tuned_frr": tuned_frr,
+    })
+    return raw
+
+
+def run_backend(model, detector, pairs_path):
+    env = dict(os.environ, FACE_MODEL=model, FACE_DETECTOR=detector, FACE_WARMUP="0", LOG_LEVEL="WARNING")
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, pairs_path], env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines() or ["no output"]
+        return {"model": model, "detector": detector, "error": lines[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", required=True, help="CSV with img1,img2,same columns")
+    parser.add_argument("--models", default=",".join(FACE_MODELS), help="comma-separated FACE_MODEL names")
+    parser.add_argument("--detectors", default="opencv", help="comma-separated FACE_DETECTOR names")
+    parser.add_argument("--target-far", type=float, default=0.001, help="FAR the tuned threshold must meet")
+    parser.add_argument("--out", help="write results as JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for model in args.models.split(","):
+        for detector in args.detectors.split(","):
+            resolve_backend(model, detector)
+            print(f"--- {model} + {detector} ---", file=sys.stderr)
+            raw = run_backend(model, detector, args.pairs)
+            results.append(raw if "error" in raw else summarise(raw, args.target_far))
+
+    print(f"{'model':<13} {'detector':<11} {'weights':>7} {'load s':>7} {'RSS MB':>7} {'peak MB':>8} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'FAR':>6} {'FRR':>6} | {'thr@FAR':>8} {'FRR':>6}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['model']:<13} {r['detector']:<11} failed: {r['error'][:80]}")
+            continue
+        print(
+            f"{r['model']:<13} {r['detector']:<11} {r['weights_mb']:>7} {r['load_seconds']:>7.1f} "
+            f"{r['rss_after_load_mb']:>7.0f} {r['peak_rss_mb']:>8.0f} {_fmt(r['embed_p50_ms'], '7.0f')} "
+            f"{_fmt(r['embed_p95_ms'], '7.0f')} {_fmt(r['far'], '6.1%')} {_fmt(r['frr'], '6.1%')} | "
+            f"{_fmt(r['tuned_threshold'], '8.3f')} {_fmt(r['tuned_frr'], '6.1%')}"
+        )
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"target_far": args.target_far, "results": results}, fh, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
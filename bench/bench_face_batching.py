@@ -0,0 +1,184 @@
+"""
+Throughput vs. added latency of face-embedding micro-batching.
+
+--concurrency client threads embed synthetic selfies back to back for
+--seconds, once unbatched (every call its own forward pass, "off") and once
+through a FaceBatcher per --windows value (FACE_BATCH_MAX_WAIT_MS). Reported
+per run: throughput, latency p50/p95/p99, mean batch size, and the p50
+latency added over the unbatched run at the same concurrency.
+
+The real engine (face_engine.embed_many, needs DeepFace) is used by default.
+--simulate FIXED_MS,PER_IMAGE_MS swaps it for a model that takes
+FIXED + PER_IMAGE x batch size and runs one pass at a time (a saturated CPU),
+to study the queueing alone or to size the window from a measured cost model.
+
+Usage (from the repo root):
+    python -m bench.bench_face_batching --concurrency 1,4,16 --windows 0,2,5,10,20
+    python -m bench.bench_face_batching --simulate 40,5 --out batching.json
+"""
+import os
+import json
+import time
+import argparse
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("FACE_WARMUP", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import numpy as np
+
+from bench import synthetic
+from services.face_batcher import FaceBatcher
+
+
+# ------------------------------------------
+# MODELS
+# ------------------------------------------
+def simulated_embed_many(fixed_ms, per_image_ms):
+    lock = threading.Lock()
+
+    def embed_many(images):
+        with lock:
+            time.sleep((fixed_ms + per_image_ms * len(images)) / 1000.0)
+        return [np.zeros(128, dtype=np.float32) for _ in images]
+    return embed_many
+
+
+def real_embed_many():
+    from services import face_engine
+
+    face_engine.load_engine()
+    return face_engine.embed_many
+
+
+class CountingModel:
+    """
+    Wraps embed_many and records the size of every forward pass.
+    """
+
+    def __init__(self, embed_many):
+        self._embed_many = embed_many
+        self._lock = threading.Lock()
+        self.sizes = []
+
+    def __call__(self, images):
+        with self._lock:
+            self.sizes.append(len(images))
+        return self._embed_many(images)
+
+    def reset(self):
+        with self._lock:
+            sizes, self.sizes = self.sizes, []
+        return sizes
+
+
+# ------------------------------------------
+# LOAD
+# ------------------------------------------
+def make_selfies(count, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        synthetic.render_face(synthetic.face_identity(rng), 480, rng, jitter=1.0)
+        for _ in range(count)
+    ]
+
+
+def run_load(embed_one, selfies, concurrency, seconds):
+    stop = time.monotonic() + seconds
+
+    def client(index):
+        latencies, k = [], index
+        while time.monotonic() < stop:
+            image = selfies[k % len(selfies)]
+            k += concurrency
+            start = time.perf_counter()
+            embed_one(image)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [ms for client_ms in pool.map(client, range(concurrency)) for ms in client_ms]
+    return latencies, time.perf_counter() - start
+
+
+def summarise(latencies, elapsed, sizes):
+    ms = np.asarray(latencies, dtype=np.float64)
+    return {
+        "requests": int(ms.size),
+        "throughput": round(ms.size / elapsed, 2),
+        "p50": round(float(np.percentile(ms, 50)), 2),
+        "p95": round(float(np.percentile(ms, 95)), 2),
+        "p99": round(float(np.percentile(ms, 99)), 2),
+        "mean_batch": round(float(np.mean(sizes)), 2) if sizes else None,
+    }
+
+
+# ------------------------------------------
+# MAIN
+# ------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated client thread counts")
+    parser.add_argument("--windows", default="0,2,5,10,20", help="comma-separated batch windows in ms")
+    parser.add_argument("--max-batch", type=int, default=8, help="FACE_BATCH_MAX_SIZE")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each run")
+    parser.add_argument("--selfies", type=int, default=32, help="distinct synthetic selfies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--simulate", help="FIXED_MS,PER_IMAGE_MS cost model instead of DeepFace")
+    parser.add_argument("--out", help="write results as JSON here")
+    args = parser.parse_args()
+
+    if args.simulate:
+        fixed_ms, per_image_ms = (float(v) for v in args.simulate.split(","))
+        model = CountingModel(simulated_embed_many(fixed_ms, per_image_ms))
+    else:
+        model = CountingModel(real_embed_many())
+
+    selfies = make_selfies(args.selfies, args.seed)
+    # Warm-up: first single and batched passes build the graph for both shapes
+    model(selfies[:1])
+    model(selfies[:2])
+    model.reset()
+
+    results = []
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        runs = [("off", lambda image: model([image])[0])]
+        for window in (float(w) for w in args.windows.split(",")):
+            batcher = FaceBatcher(model, max_batch=args.max_batch, max_wait_ms=window)
+            runs.append((window, batcher.embed))
+
+        baseline_p50 = None
+        for window, embed_one in runs:
+            latencies, elapsed = run_load(embed_one, selfies, concurrency, args.seconds)
+            row = {"concurrency": concurrency, "window_ms": window,
+                   **summarise(latencies, elapsed, model.reset())}
+            if window == "off":
+                baseline_p50 = row["p50"]
+            row["added_p50"] = round(row["p50"] - baseline_p50, 2)
+            results.append(row)
+
+    print(f"{'clients':>7} {'window':>7} {'img/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'batch':>6} {'+p50 ms':>8}")
+    for r in results:
+        window = r["window_ms"] if r["window_ms"] == "off" else f"{r['window_ms']:g}"
+        print(f"{r['concurrency']:>7} {window:>7} {r['throughput']:>8.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+              f"{r['p99']:>8.1f} {r['mean_batch'] or 0:>6.2f} {r['added_p50']:>+8.1f}")
+
+    if args.out:
+        meta = {
+            "model": args.simulate and f"simulated {args.simulate}" or os.environ.get("FACE_MODEL", "VGG-Face"),
+            "max_batch": args.max_batch,
+            "seconds": args.seconds,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        }
+        with open(args.out, "w") as fh:
+            json.dump({"meta": meta, "results": results}, fh, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
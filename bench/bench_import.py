@@ -0,0 +1,63 @@
+"""
+Import-time guard for the web worker.
+
+Imports `app` in a fresh interpreter (background warm-up disabled) and fails
+if it takes longer than the budget or drags in a heavy ML stack. Meant to run
+in CI so a stray top-level `import deepface` does not slip back in.
+
+Usage (from the repo root):
+    python -m bench.bench_import [--max-seconds 2.0] [--repeat 5]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Modules that must only be imported lazily (face / risk engines)
+HEAVY_MODULES = ["tensorflow", "keras", "deepface", "torch", "sklearn", "joblib"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_once():
+    env = dict(os.environ, FACE_WARMUP="0")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time guard for app.py")
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    times = sorted(run["seconds"] for run in runs)
+    heavy = sorted({m for run in runs for m in run["heavy"]})
+
+    print(f"import app: min {times[0]:.3f}s / median {times[len(times) // 2]:.3f}s over {len(runs)} runs")
+
+    failed = False
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if times[len(times) // 2] > args.max_seconds:
+        print(f"❌ Median import time above budget ({args.max_seconds:.1f}s)")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ Import time within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Peak memory per upload for the in-memory ingestion path.
+
+Each case runs in a fresh interpreter: imports are done first, then one
+upload goes through ingest_upload + convert_pdf_to_image, and we report the
+growth of the process peak RSS (VmHWM, Linux) plus the tracemalloc peak.
+The upload bytes themselves are counted, so "RSS / upload size" shows how
+many extra copies the path makes.
+
+Usage (from the repo root):
+    python -m bench.bench_ingest [--megapixels 12]
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+PROBE = r"""
+import io, os, sys, json, tracemalloc
+os.environ["PERSIST_UPLOADS"] = "0"
+from werkzeug.datastructures import FileStorage
+from services.upload_store import ingest_upload
+from services.document_service import convert_pdf_to_image
+
+path = sys.argv[1]
+with open(path, "rb") as fh:
+    # Stands in for werkzeug's spooled request file
+    storage = FileStorage(io.BytesIO(fh.read()), filename=os.path.basename(path))
+
+def peak_rss_kb():
+    # VmHWM belongs to this process image (ru_maxrss survives fork + exec from the parent)
+    with open("/proc/self/status") as fh:
+        return int(fh.read().split("VmHWM:")[1].split()[0])
+
+try:
+    # Reset the high-water mark to the current RSS so only the upload is measured
+    with open("/proc/self/clear_refs", "w") as fh:
+        fh.write("5")
+except OSError:
+    pass
+
+baseline = peak_rss_kb()
+tracemalloc.start()
+upload = ingest_upload(storage)
+image = convert_pdf_to_image(upload.data, upload.ext)
+_, traced_peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+
+print(json.dumps({
+    "upload_mb": len(upload.data) / 1e6,
+    "decoded_mb": image.nbytes / 1e6,
+    "peak_rss_growth_mb": (peak_rss_kb() - baseline) / 1024,
+    "tracemalloc_peak_mb": traced_peak / 1e6,
+}))
+"""
+
+
+def make_samples(folder, megapixels):
+    """
+    Synthetic camera-like frame (gradient + noise keeps the JPEG realistically large)
+    and an A4 PDF wrapping the same frame.
+    """
+    import cv2
+    import fitz
+    import numpy as np
+
+    h = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    w = int(h * 4 / 3)
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, w, dtype=np.float32)[None, :, None]
+    frame = (gradient + rng.normal(0, 12, (h, w, 3))).clip(0, 255).astype(np.uint8)
+    jpg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)  # A4 in points
+    page.insert_image(page.rect, stream=jpg)
+
+    paths = {"image": os.path.join(folder, "sample.jpg"), "pdf": os.path.join(folder, "sample.pdf")}
+    with open(paths["image"], "wb") as fh:
+        fh.write(jpg)
+    doc.save(paths["pdf"])
+    return paths
+
+
+def run_case(path):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, path], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory per upload")
+    parser.add_argument("--megapixels", type=float, default=12.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        samples = make_samples(folder, args.megapixels)
+
+        print(f"{'kind':<6} {'upload MB':>10} {'decoded MB':>11} {'peak RSS +MB':>13} {'traced MB':>10}")
+        for kind, path in samples.items():
+            r = run_case(path)
+            print(
+                f"{kind:<6} {r['upload_mb']:>10.1f} {r['decoded_mb']:>11.1f} "
+                f"{r['peak_rss_growth_mb']:>13.1f} {r['tracemalloc_peak_mb']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
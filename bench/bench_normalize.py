@@ -0,0 +1,75 @@
+"""
+Latency vs. accuracy of the resolution-normalising stage ahead of OCR.
+
+Usage (from the repo root):
+    python -m bench.bench_normalize --samples path/to/samples
+
+The samples folder holds card images / PDFs plus a labels.csv with
+`file,kind,number` rows (kind = aadhaar | pan). Every sample is run through
+each (PDF DPI, OCR pixel budget) combination and we report mean / p95 OCR
+latency and how often the expected number came back.
+"""
+import os
+import csv
+import time
+import argparse
+import numpy as np
+
+from services.document_service import convert_pdf_to_image
+from services.image_preprocess import crop_card_region, fit_pixel_budget
+from services.ocr_service import extract_aadhaar_text, extract_pan_text
+
+DPIS = [150, 200, 300]
+BUDGETS = [None, 4_000_000, 2_500_000, 1_500_000, 1_000_000]
+
+
+def load_labels(samples_dir):
+    with open(os.path.join(samples_dir, "labels.csv"), newline="") as fh:
+        return [row for row in csv.DictReader(fh)]
+
+
+def run_one(path, kind, expected, dpi, budget):
+    start = time.perf_counter()
+
+    with open(path, "rb") as fh:
+        image = convert_pdf_to_image(fh.read(), os.path.splitext(path)[1].lower(), dpi=dpi)
+    card = crop_card_region(image) if kind == "aadhaar" else image
+    if budget:
+        card = fit_pixel_budget(card, budget)
+
+    if kind == "aadhaar":
+        found = extract_aadhaar_text(card)["aadhaar_number"]
+    else:
+        found = extract_pan_text(card)["pan_number"]
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, found == expected, card.shape[0] * card.shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", required=True, help="folder with documents + labels.csv")
+    args = parser.parse_args()
+
+    labels = load_labels(args.samples)
+    has_pdf = any(row["file"].lower().endswith(".pdf") for row in labels)
+
+    print(f"{'dpi':>5} {'budget':>10} {'pixels':>10} {'mean ms':>9} {'p95 ms':>9} {'accuracy':>9}")
+    for dpi in (DPIS if has_pdf else [DPIS[0]]):
+        for budget in BUDGETS:
+            times, hits, pixels = [], 0, []
+            for row in labels:
+                path = os.path.join(args.samples, row["file"])
+                ms, ok, px = run_one(path, row["kind"], row["number"], dpi, budget)
+                times.append(ms)
+                pixels.append(px)
+                hits += ok
+
+            print(
+                f"{dpi if has_pdf else '-':>5} {budget or 'full':>10} {int(np.mean(pixels)):>10} "
+                f"{np.mean(times):>9.1f} {np.percentile(times, 95):>9.1f} {hits / len(labels):>9.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+End-to-end KYC pipeline benchmark on synthetic documents.
+
+Generates Aadhaar / PAN cards (images and PDFs, valid Verhoeff numbers,
+mixed resolution and blur) plus synthetic faces (see bench/synthetic.py),
+then times each stage directly and the whole flow through the Flask test
+client, at every requested concurrency level:
+
+    convert      convert_pdf_to_image on the Aadhaar upload
+    aadhaar_ocr  extract_aadhaar_text on the decoded card (accuracy = number found)
+    pan_ocr      extract_pan_text on the decoded card
+    face         verify_face_match on genuine + impostor pairs (accuracy = correct decision)
+    risk         predict_risk
+    flask        POST / -> POST /upload -> poll /jobs/<id> -> POST /process-face
+
+Reports p50/p95/p99 latency, throughput and peak RSS per stage, and writes
+the results as JSON so two releases can be diffed (--baseline).
+Stages whose engine is not installed (e.g. no tesseract binary) are reported
+as skipped rather than failing the run.
+
+Usage (from the repo root):
+    python -m bench.bench_pipeline [--samples 24] [--concurrency 1,4] [--out bench.json]
+    python -m bench.bench_pipeline --stages risk,face --baseline previous.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep the run self-contained: uploads, caches and sessions live in a scratch dir.
+# Set before any service module is imported (they read these at import time);
+# spawned OCR workers inherit them.
+_SCRATCH = os.environ.setdefault("BENCH_SCRATCH_DIR", tempfile.mkdtemp(prefix="kyc-bench-"))
+os.environ.setdefault("UPLOAD_FOLDER", os.path.join(_SCRATCH, "uploads"))
+os.environ.setdefault("OCR_CACHE_PATH", os.path.join(_SCRATCH, "ocr_cache.sqlite3"))
+os.environ.setdefault("SESSION_BACKEND", "memory")
+os.environ.setdefault("FACE_WARMUP", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import cv2
+import numpy as np
+
+from bench import synthetic
+
+STAGES = ["convert", "aadhaar_ocr", "pan_ocr", "face", "risk", "flask"]
+
+# Poll interval of the simulated browser while the OCR job runs
+POLL_SECONDS = 0.05
+
+
+# ------------------------------------------
+# MEASUREMENT HELPERS
+# ------------------------------------------
+def latency_summary(ms):
+    ms = np.asarray(ms, dtype=np.float64)
+    if ms.size == 0:
+        return None
+    return {
+        "mean": round(float(ms.mean()), 2),
+        "p50": round(float(np.percentile(ms, 50)), 2),
+        "p95": round(float(np.percentile(ms, 95)), 2),
+        "p99": round(float(np.percentile(ms, 99)), 2),
+        "max": round(float(ms.max()), 2),
+    }
+
+
+def reset_peak_rss():
+    # Linux: resets VmHWM to the current RSS so each stage gets its own peak
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as fh:
+            return int(fh.read().split("VmHWM:")[1].split()[0]) / 1024
+    except (OSError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_stage(name, fn, items, concurrency):
+    """
+    Calls fn(item) for every item from `concurrency` threads. fn returns True/False
+    (correct result or not) or None when accuracy does not apply.
+    The first item is run once, untimed and left out of the results: it warms
+    models (and would be an OCR cache hit afterwards) and tells us whether the
+    stage can run here at all.
+    """
+    warmup, items = items[0], items[1:] or items
+    result = {"stage": name, "concurrency": concurrency, "n": len(items)}
+
+    try:
+        fn(warmup)
+    except Exception as e:
+        result["skipped"] = f"{type(e).__name__}: {e}"
+        return result
+
+    latencies, outcomes, errors = [], [], []
+
+    def one(item):
+        start = time.perf_counter()
+        try:
+            ok = fn(item)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            ok = False
+        latencies.append((time.perf_counter() - start) * 1000)
+        outcomes.append(ok)
+
+    reset_peak_rss()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, items))
+    wall = time.perf_counter() - wall_start
+
+    scored = [ok for ok in outcomes if ok is not None]
+    result.update({
+        "errors": len(errors),
+        "latency_ms": latency_summary(latencies),
+        "throughput_per_s": round(len(items) / wall, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "accuracy": round(sum(bool(ok) for ok in scored) / len(scored), 3) if scored else None,
+    })
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+# ------------------------------------------
+# STAGES
+# ------------------------------------------
+def _decode(upload):
+    from services.document_service import convert_pdf_to_image
+    ext, data = upload
+    return convert_pdf_to_image(data, ext)
+
+
+def stage_convert(samples):
+    def fn(sample):
+        _decode(sample["aadhaar"])
+    return fn, samples
+
+
+def stage_aadhaar_ocr(samples):
+    from services.ocr_service import extract_aadhaar_text
+
+    items = [(_decode(s["aadhaar"]), s["who"]["aadhaar"]) for s in samples]
+
+    def fn(item):
+        image, expected = item
+        return extract_aadhaar_text(image)["aadhaar_number"] == expected
+    return fn, items
+
+
+def stage_pan_ocr(samples):
+    from services.ocr_service import extract_pan_text
+
+    items = [(_decode(s["pan"]), s["who"]["pan"]) for s in samples]
+
+    def fn(item):
+        image, expected = item
+        return extract_pan_text(image)["pan_number"] == expected
+    return fn, items
+
+
+def _selfie(identity, seed):
+    return synthetic.render_face(identity, 480, np.random.default_rng(seed), jitter=1.0)
+
+
+def stage_face(samples):
+    from services.face_service import verify_face_match
+
+    items = []
+    for i, sample in enumerate(samples):
+        card = _decode(sample["aadhaar"])
+        genuine = i % 2 == 0
+        # Impostor pairs take the next person's face
+        owner = sample if genuine else samples[(i + 1) % len(samples)]
+        items.append((card, _selfie(owner["who"]["face"], i), genuine))
+
+    def fn(item):
+        card, selfie, genuine = item
+        result = verify_face_match(card, selfie)
+        if result["error"]:
+            raise RuntimeError(result["error"])
+        return result["match"] == genuine
+    return fn, items
+
+
+def stage_risk(samples):
+    from services.risk_model import predict_risk
+
+    rng = np.random.default_rng(0)
+    items = [
+        (float(rng.uniform(0, 100)), float(rng.uniform(0, 100)), bool(rng.random() < 0.9), float(rng.uniform(0, 300)))
+        for _ in range(max(200, len(samples) * 20))
+    ]
+
+    def fn(item):
+        predict_risk(*item)
+    return fn, items
+
+
+def stage_flask(samples):
+    import io
+    from app import app
+
+    def fn(sample):
+        who = sample["who"]
+        client = app.test_client()
+
+        client.post("/", data={
+            "name": who["name"], "dob": who["dob"],
+            "aadhaar_last4": who["aadhaar"][-4:], "pan_number": who["pan"],
+        })
+
+        (a_ext, a_data), (p_ext, p_data) = sample["aadhaar"], sample["pan"]
+        response = client.post("/upload", data={
+            "aadhaar": (io.BytesIO(a_data), "aadhaar" + a_ext),
+            "pan": (io.BytesIO(p_data), "pan" + p_ext),
+        }, content_type="multipart/form-data")
+        if response.status_code != 202:
+            raise RuntimeError(f"/upload returned {response.status_code}")
+
+        job_id = response.get_json()["job_id"]
+        while True:
+            job = client.get(f"/jobs/{job_id}").get_json()
+            if job["status"] not in ("queued", "running"):
+                break
+            time.sleep(POLL_SECONDS)
+
+        if job["status"] != "done":
+            raise RuntimeError(job.get("error", job["status"]))
+        if job["errors"]:
+            return False
+
+        selfie = cv2.imencode(".jpg", _selfie(who["face"], 0))[1].tobytes()
+        # Same binary body the face-verify page sends
+        page = client.post("/process-face", data=selfie, content_type="image/jpeg",
+                           headers={"X-Selfie-Source": "webcam"})
+        return "KYC APPROVED" in page.get_data(as_text=True)
+
+    return fn, samples
+
+
+STAGE_BUILDERS = {
+    "convert": stage_convert,
+    "aadhaar_ocr": stage_aadhaar_ocr,
+    "pan_ocr": stage_pan_ocr,
+    "face": stage_face,
+    "risk": stage_risk,
+    "flask": stage_flask,
+}
+
+
+# ------------------------------------------
+# REPORTING
+# ------------------------------------------
+def run_metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "git_commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "samples": args.samples,
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+        "stages": args.stages,
+    }
+
+
+def print_table(results, baseline=None):
+    previous = {(r["stage"], r["concurrency"]): r for r in (baseline or {}).get("results", [])}
+
+    print(f"{'stage':<12} {'conc':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'peak MB':>8} {'acc':>6}  vs baseline")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['stage']:<12} {r['concurrency']:>4}  skipped: {r['skipped'][:70]}")
+            continue
+
+        lat = r["latency_ms"]
+        acc = "-" if r["accuracy"] is None else f"{r['accuracy']:.0%}"
+        delta = ""
+        old = previous.get((r["stage"], r["concurrency"]))
+        if old and old.get("latency_ms"):
+            p95_change = (lat["p95"] / old["latency_ms"]["p95"] - 1) * 100 if old["latency_ms"]["p95"] else 0.0
+            tput_change = (r["throughput_per_s"] / old["throughput_per_s"] - 1) * 100 if old["throughput_per_s"] else 0.0
+            delta = f"p95 {p95_change:+.1f}%, req/s {tput_change:+.1f}%"
+
+        print(
+            f"{r['stage']:<12} {r['concurrency']:>4} {lat['p50']:>9.1f} {lat['p95']:>9.1f} {lat['p99']:>9.1f} "
+            f"{r['throughput_per_s']:>8.1f} {r['peak_rss_mb']:>8.0f} {acc:>6}  {delta}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=24, help="synthetic people per stage and concurrency level")
+    parser.add_argument("--concurrency", default="1,4", help="comma-separated client counts")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"subset of {','.join(STAGES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON here")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    args = parser.parse_args()
+
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+
+    print(f"--- Generating {args.samples * len(args.concurrency)} synthetic people (seed {args.seed}) ---", file=sys.stderr)
+    corpus = synthetic.make_corpus(args.samples * len(args.concurrency), seed=args.seed)
+
+    results = []
+    for stage in args.stages:
+        for level, concurrency in enumerate(args.concurrency):
+            # Fresh documents per level, so the content-hash OCR cache never turns the flask stage into cache hits
+            samples = corpus[level * args.samples:(level + 1) * args.samples]
+            fn, items = STAGE_BUILDERS[stage](samples)
+            print(f"--- {stage} x{concurrency} ({len(items)} items) ---", file=sys.stderr)
+            results.append(run_stage(stage, fn, items, concurrency))
+
+    print_table(results, baseline)
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"meta": run_metadata(args), "results": results}, fh, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
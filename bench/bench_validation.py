@@ -0,0 +1,54 @@
+"""
+Scalar vs. vectorised Aadhaar / PAN validation.
+
+Usage (from the repo root):
+    python -m bench.bench_validation [--rows 1000000]
+"""
+import time
+import argparse
+import numpy as np
+
+from services.aadhaar_validator import validate_aadhaar_number, validate_aadhaar_numbers
+from services.pan_validator import validate_pan_number, validate_pan_numbers
+
+
+def make_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    aadhaar = rng.integers(10**11, 10**12, size=rows).astype(str)
+
+    letters = rng.integers(65, 91, size=(rows, 6)).astype(np.uint32)
+    digits = rng.integers(48, 58, size=(rows, 4)).astype(np.uint32)
+    codes = np.concatenate([letters[:, :5], digits, letters[:, 5:]], axis=1)
+    pan = codes.view("U10").ravel()
+    return aadhaar, pan
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk validation benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    aadhaar, pan = make_data(args.rows)
+    aadhaar_list, pan_list = aadhaar.tolist(), pan.tolist()
+
+    print(f"{'check':<10} {'scalar s':>9} {'bulk s':>9} {'speed-up':>9} {'same':>6}")
+    for name, scalar, bulk, values in [
+        ("aadhaar", validate_aadhaar_number, validate_aadhaar_numbers, aadhaar_list),
+        ("pan", validate_pan_number, validate_pan_numbers, pan_list),
+    ]:
+        t_scalar, expected = timed(lambda: np.array([scalar(v) for v in values]))
+        t_bulk, got = timed(lambda: bulk(values))
+        print(
+            f"{name:<10} {t_scalar:>9.2f} {t_bulk:>9.2f} {t_scalar / t_bulk:>8.1f}x "
+            f"{str(bool((expected == got).all())):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Synthetic Aadhaar / PAN cards, PDFs and faces for the benchmarks.
+
+Everything is generated from a seed (no real personal data, nothing to
+download), so two runs with the same arguments see byte-identical inputs.
+Aadhaar numbers carry a valid Verhoeff check digit; PAN numbers follow the
+AAAAA9999A layout with a "P" (individual) fourth letter.
+"""
+import string
+
+import cv2
+import numpy as np
+
+from utils.verhoeff import generate as verhoeff_check_digit
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Card size in pixels at scale 1.0 (CR80 card at 300 DPI)
+CARD_W, CARD_H = 1012, 638
+
+FIRST_NAMES = ["RAHUL", "PRIYA", "ANIL", "SUNITA", "VIKRAM", "MEERA", "ARJUN", "KAVYA"]
+LAST_NAMES = ["SHARMA", "PATEL", "IYER", "GUPTA", "REDDY", "SINGH", "NAIR", "DAS"]
+
+
+# ------------------------------------------
+# IDENTITIES
+# ------------------------------------------
+def aadhaar_number(rng):
+    # UIDAI numbers never start with 0 or 1
+    body = str(rng.integers(2, 10)) + "".join(str(x) for x in rng.integers(0, 10, size=10))
+    return body + verhoeff_check_digit(body)
+
+
+def pan_number(rng):
+    letters = rng.choice(list(string.ascii_uppercase), size=4)
+    digits = rng.integers(0, 10, size=4)
+    return "".join(letters[:3]) + "P" + letters[3] + "".join(str(x) for x in digits) + rng.choice(list(string.ascii_uppercase))
+
+
+def person(rng):
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "dob": f"{rng.integers(1960, 2005)}-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}",
+        "aadhaar": aadhaar_number(rng),
+        "pan": pan_number(rng),
+        "face": face_identity(rng),
+    }
+
+
+# ------------------------------------------
+# FACES
+# ------------------------------------------
+def face_identity(rng):
+    """
+    Geometry + colours of one synthetic person; render_face draws it.
+    """
+    return {
+        "skin": tuple(int(x) for x in rng.integers([60, 90, 140], [140, 170, 230])),
+        "face_w": float(rng.uniform(0.30, 0.38)),
+        "face_h": float(rng.uniform(0.40, 0.48)),
+        "eye_y": float(rng.uniform(0.40, 0.46)),
+        "eye_dx": float(rng.uniform(0.11, 0.15)),
+        "mouth_w": float(rng.uniform(0.08, 0.14)),
+        "hair": int(rng.integers(10, 70)),
+    }
+
+
+def render_face(identity, size=224, rng=None, jitter=0.0):
+    """
+    BGR portrait of `identity`. jitter > 0 shifts, scales and relights it a
+    little, which is how a selfie of the same person is simulated.
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    img = np.full((size, size, 3), 200, dtype=np.uint8)
+
+    dx, dy = (rng.normal(0, jitter * size * 0.05, size=2) if jitter else (0.0, 0.0))
+    zoom = 1.0 + (rng.normal(0, jitter * 0.05) if jitter else 0.0)
+    cx, cy = size / 2 + dx, size / 2 + dy + size * 0.05
+
+    def px(v):
+        return int(round(v * size * zoom))
+
+    hair = (identity["hair"],) * 3
+    cv2.ellipse(img, (int(cx), int(cy - px(0.06))), (px(identity["face_w"]) + px(0.02), px(identity["face_h"])), 0, 180, 360, hair, -1)
+    cv2.ellipse(img, (int(cx), int(cy)), (px(identity["face_w"]), px(identity["face_h"])), 0, 0, 360, identity["skin"], -1)
+
+    eye_y = int(cy - px(0.5 - identity["eye_y"]))
+    for side in (-1, 1):
+        ex = int(cx + side * px(identity["eye_dx"]))
+        cv2.ellipse(img, (ex, eye_y), (px(0.045), px(0.022)), 0, 0, 360, (245, 245, 245), -1)
+        cv2.circle(img, (ex, eye_y), px(0.018), (40, 30, 20), -1)
+        cv2.line(img, (ex - px(0.05), eye_y - px(0.05)), (ex + px(0.05), eye_y - px(0.055)), hair, max(1, px(0.012)))
+
+    cv2.line(img, (int(cx), eye_y + px(0.03)), (int(cx - px(0.02)), eye_y + px(0.12)), (70, 90, 130), max(1, px(0.008)))
+    cv2.ellipse(img, (int(cx), eye_y + px(0.2)), (px(identity["mouth_w"]), px(0.025)), 0, 0, 180, (60, 60, 150), max(1, px(0.012)))
+
+    if jitter:
+        gain = 1.0 + rng.normal(0, jitter * 0.1)
+        img = np.clip(img.astype(np.float32) * gain + rng.normal(0, 4 * jitter, img.shape), 0, 255).astype(np.uint8)
+
+    return cv2.GaussianBlur(img, (3, 3), 0)
+
+
+# ------------------------------------------
+# CARDS
+# ------------------------------------------
+def _text(img, text, x, y, scale, thickness=2):
+    cv2.putText(img, text, (x, y), FONT, scale, (20, 20, 20), thickness, cv2.LINE_AA)
+
+
+def _finish(card, scale, blur):
+    if scale != 1.0:
+        card = cv2.resize(card, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if blur > 0:
+        card = cv2.GaussianBlur(card, (0, 0), blur)
+    return card
+
+
+def aadhaar_card(who, scale=1.0, blur=0.0, with_vid=True):
+    """
+    Front of an Aadhaar card: photo, name, DOB, and the "XXXX XXXX XXXX" band.
+    A 16-digit VID line underneath exercises the candidate selection in OCR.
+    """
+    card = np.full((CARD_H, CARD_W, 3), 250, dtype=np.uint8)
+    cv2.rectangle(card, (0, 0), (CARD_W, 90), (60, 140, 230), -1)
+    _text(card, "GOVERNMENT OF INDIA", 290, 60, 1.3, 3)
+
+    card[140:140 + 260, 50:50 + 220] = cv2.resize(render_face(who["face"], 260), (220, 260))
+
+    _text(card, who["name"], 310, 190, 1.1)
+    _text(card, f"DOB: {who['dob'][8:10]}/{who['dob'][5:7]}/{who['dob'][:4]}", 310, 250, 1.0)
+    _text(card, "MALE", 310, 305, 1.0)
+
+    number = who["aadhaar"]
+    _text(card, f"{number[:4]} {number[4:8]} {number[8:]}", 300, 500, 1.8, 4)
+    if with_vid:
+        vid = "".join(str((int(c) * 3 + 7) % 10) for c in number + "2468")
+        _text(card, f"VID : {vid[:4]} {vid[4:8]} {vid[8:12]} {vid[12:]}", 300, 570, 0.9)
+
+    return _finish(card, scale, blur)
+
+
+def pan_card(who, scale=1.0, blur=0.0):
+    card = np.full((CARD_H, CARD_W, 3), 235, dtype=np.uint8)
+    cv2.rectangle(card, (0, 0), (CARD_W, 80), (200, 160, 90), -1)
+    _text(card, "INCOME TAX DEPARTMENT", 250, 55, 1.2, 3)
+
+    _text(card, "Permanent Account Number Card", 60, 150, 0.9)
+    _text(card, who["pan"], 60, 220, 1.6, 4)
+    _text(card, who["name"], 60, 320, 1.0)
+    _text(card, f"{who['dob'][8:10]}/{who['dob'][5:7]}/{who['dob'][:4]}", 60, 400, 1.0)
+
+    card[330:330 + 260, 760:760 + 200] = cv2.resize(render_face(who["face"], 260), (200, 260))
+    return _finish(card, scale, blur)
+
+
+def to_jpeg(image, quality=90):
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def to_pdf(image, pages=1):
+    """
+    A4 "scan" with the card in the upper third; extra pages are blank,
+    as with a multi-page e-Aadhaar printout.
+    """
+    import fitz
+
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page(width=595, height=842)
+        if page_no == 0:
+            h, w = image.shape[:2]
+            width = 400
+            page.insert_image(fitz.Rect(90, 60, 90 + width, 60 + width * h / w), stream=to_jpeg(image))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# ------------------------------------------
+# CORPUS
+# ------------------------------------------
+def make_corpus(n, seed=0, scales=(1.0, 0.6), blurs=(0.0, 1.5), pdf_every=3):
+    """
+    n people, each with an Aadhaar and a PAN upload. Resolution and blur cycle
+    through `scales` / `blurs`; every `pdf_every`-th Aadhaar is wrapped in a PDF.
+    Each sample: {"who", "aadhaar": (ext, bytes), "pan": (ext, bytes), "scale", "blur"}.
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+
+    for i in range(n):
+        who = person(rng)
+        scale = scales[i % len(scales)]
+        blur = blurs[(i // len(scales)) % len(blurs)]
+
+        card = aadhaar_card(who, scale=scale, blur=blur)
+        if pdf_every and i % pdf_every == pdf_every - 1:
+            aadhaar = (".pdf", to_pdf(card))
+        else:
+            aadhaar = (".jpg", to_jpeg(card))
+
+        samples.append({
+            "who": who,
+            "aadhaar": aadhaar,
+            "pan": (".jpg", to_jpeg(pan_card(who, scale=scale, blur=blur))),
+            "scale": scale,
+            "blur": blur,
+        })
+
+    return samples
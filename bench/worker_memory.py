@@ -0,0 +1,97 @@
+"""
+Per-worker memory of a running gunicorn: RSS, PSS and USS of the master and
+each worker, from /proc/<pid>/smaps_rollup (Linux).
+
+USS (private pages) is the number that matters for "how many workers fit":
+with preload and a memory-mapped risk model, the model pages move from each
+worker's USS into shared memory. Compare two runs, e.g.
+
+    GUNICORN_PRELOAD=0 gunicorn app:app &   python -m bench.worker_memory
+    GUNICORN_PRELOAD=1 gunicorn app:app &   python -m bench.worker_memory
+
+Wait for /readyz on every worker (models loaded) before measuring.
+
+Usage (from the repo root):
+    python -m bench.worker_memory                  # finds the gunicorn master
+    python -m bench.worker_memory --pid 12345 --out memory.json
+"""
+import os
+import sys
+import json
+import argparse
+
+from services.metrics import process_memory
+
+
+def _is_gunicorn(pid):
+    # "gunicorn ..." or "python .../gunicorn ...", not a shell that mentions it
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as fh:
+            argv = fh.read().decode(errors="replace").split("\0")
+    except OSError:
+        return False
+    return any(os.path.basename(arg).startswith("gunicorn") for arg in argv[:2])
+
+
+def _ppid(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            # The command name may contain spaces; fields after ")" are fixed
+            return int(fh.read().rsplit(")", 1)[1].split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def find_master():
+    """
+    The gunicorn process whose parent is not itself gunicorn.
+    """
+    pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    gunicorns = {pid for pid in pids if _is_gunicorn(pid)}
+    masters = [pid for pid in gunicorns if _ppid(pid) not in gunicorns]
+    if len(masters) != 1:
+        raise SystemExit(f"Found {len(masters)} gunicorn masters, pass --pid")
+    return masters[0]
+
+
+def worker_pids(master):
+    pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    return sorted(pid for pid in pids if _ppid(pid) == master)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pid", type=int, help="gunicorn master PID (default: find it)")
+    parser.add_argument("--out", help="write results as JSON here")
+    args = parser.parse_args()
+
+    master = args.pid or find_master()
+    rows = [("master", master, process_memory(master))]
+    rows += [("worker", pid, process_memory(pid)) for pid in worker_pids(master)]
+
+    if rows[0][2] is None:
+        raise SystemExit(f"/proc/{master}/smaps_rollup is not readable")
+
+    mb = 1024 * 1024
+    print(f"{'role':<7} {'pid':>7} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}")
+    for role, pid, usage in rows:
+        if usage is None:
+            print(f"{role:<7} {pid:>7} (exited)", file=sys.stderr)
+            continue
+        print(f"{role:<7} {pid:>7} {usage['rss'] / mb:>8.1f} {usage['pss'] / mb:>8.1f} {usage['uss'] / mb:>8.1f}")
+
+    workers = [usage for role, _, usage in rows if role == "worker" and usage]
+    # Sum of PSS over all processes = real footprint of the whole server
+    total_pss = sum(usage["pss"] for _, _, usage in rows if usage)
+    if workers:
+        print(f"workers: {len(workers)}, mean USS {sum(u['uss'] for u in workers) / len(workers) / mb:.1f} MB, "
+              f"total PSS (master + workers) {total_pss / mb:.1f} MB")
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump([{"role": role, "pid": pid, **(usage or {})} for role, pid, usage in rows], fh, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# gunicorn.conf.py -- picked up automatically by `gunicorn app:app` from the repo root
+import gc
+import os
+import logging
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+# Sessions and upload-job results must be visible to every worker: the next request
+# or job poll may land on a different one. The in-process memory store cannot do that.
+if workers > 1:
+    if os.environ.setdefault("SESSION_BACKEND", "sqlite").lower() != "sqlite":
+        raise RuntimeError(
+            f"SESSION_BACKEND={os.environ['SESSION_BACKEND']} keeps state inside one process; "
+            f"use SESSION_BACKEND=sqlite with WEB_CONCURRENCY={workers}, or WEB_CONCURRENCY=1"
+        )
+
+# Threads per worker (gthread when > 1). Face micro-batching (on unless FACE_BATCHING=0)
+# only groups requests in flight in the same worker: with one sync thread every batch
+# would hold a single image, so it defaults to 4 threads when batching is on.
+FACE_BATCHING = os.environ.get("FACE_BATCHING", "1") != "0"
+threads = int(os.environ.get("GUNICORN_THREADS", 4 if FACE_BATCHING else 1))
+
+# Import the app (and load the risk model) once in the master, then fork the
+# workers: the model pages are shared copy-on-write instead of loaded per worker.
+# GUNICORN_PRELOAD=0 restores independent per-worker loading.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+# Also load the DeepFace/TensorFlow model in the master. Off by default:
+# TensorFlow's thread pools do not survive fork and inference in the workers
+# can hang with some builds. Verify with bench.worker_memory and a smoke test first.
+FACE_PRELOAD = os.environ.get("FACE_PRELOAD", "0") == "1"
+
+if preload_app:
+    # Read by app.py at import: defer the warm-up thread to post_fork
+    os.environ["KYC_PRELOADED"] = "1"
+
+log = logging.getLogger("kyc")
+
+
+def when_ready(server):
+    # Master, after the app import and before the first worker is forked
+    if preload_app:
+        import app
+        app.preload_models(face=FACE_PRELOAD)
+        log.info("📦 Models preloaded in master (face model: %s)", "yes" if FACE_PRELOAD else "no")
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach: a collection in
+    # the worker would otherwise write to (and so un-share) every object header
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app
+        app.start_warmup()
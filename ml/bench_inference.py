@@ -0,0 +1,66 @@
+"""
+Risk model inference: joblib + sklearn vs. the compact NumPy export.
+
+Usage:
+    python ml/bench_inference.py [--rows 10000] [--repeat 500]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk model inference benchmark")
+    parser.add_argument("--rows", type=int, default=10_000, help="batch size for the batch test")
+    parser.add_argument("--repeat", type=int, default=500, help="single-row iterations")
+    args = parser.parse_args()
+
+    from ml.train_model import generate_synthetic_data
+    from services.compact_forest import flatten_forest
+    from services.risk_model import FEATURE_COLUMNS, model_path
+
+    # Load cost includes the imports each path needs
+    start = time.perf_counter()
+    import joblib
+    from services.risk_model import load_sklearn_artifact
+    sk_model = load_sklearn_artifact(model_path)
+    sk_load = time.perf_counter() - start
+
+    compact = flatten_forest(sk_model, FEATURE_COLUMNS)
+    tmp_path = os.path.join(os.path.dirname(__file__), "_bench_model.npz")
+    compact.save(tmp_path)
+    start = time.perf_counter()
+    from services.compact_forest import CompactForest
+    compact = CompactForest.load(tmp_path)
+    compact_load = time.perf_counter() - start
+    os.remove(tmp_path)
+
+    X, _ = generate_synthetic_data(n=args.rows)
+    row = [X[0].tolist()]
+
+    diff = np.abs(sk_model.predict_proba(X)[:, 1] - compact.predict_proba(X)[:, 1]).max()
+
+    sk_single = timed(lambda: sk_model.predict_proba(row), max(1, args.repeat // 10))
+    compact_single = timed(lambda: compact.predict_proba(row), args.repeat)
+    sk_batch = timed(lambda: sk_model.predict_proba(X), 3)
+    compact_batch = timed(lambda: compact.predict_proba(X), 3)
+
+    print(f"{'':<10} {'load ms':>9} {'1 row us':>10} {f'{args.rows} rows ms':>14}")
+    print(f"{'sklearn':<10} {sk_load * 1e3:>9.1f} {sk_single * 1e6:>10.1f} {sk_batch * 1e3:>14.1f}")
+    print(f"{'compact':<10} {compact_load * 1e3:>9.1f} {compact_single * 1e6:>10.1f} {compact_batch * 1e3:>14.1f}")
+    print(f"max |p_sklearn - p_compact| = {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
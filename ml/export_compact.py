@@ -0,0 +1,30 @@
+"""
+Export ml/risk_model.pkl to the compact NumPy format (ml/risk_model.npz).
+
+The web worker then scores with plain NumPy and never imports sklearn.
+The export records the .pkl hash; if the .pkl changes, the stale export is ignored.
+
+Usage:
+    python ml/export_compact.py [ml/risk_model.pkl]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.compact_forest import flatten_forest
+from services.risk_model import FEATURE_COLUMNS, load_sklearn_artifact, file_sha256
+
+
+def export_compact(pkl_path="ml/risk_model.pkl"):
+    model = load_sklearn_artifact(pkl_path)
+    out_path = os.path.splitext(pkl_path)[0] + ".npz"
+
+    forest = flatten_forest(model, FEATURE_COLUMNS)
+    forest.save(out_path, source_sha256=file_sha256(pkl_path))
+    print(f"Saved compact model to {out_path} ({len(forest.roots)} trees, {len(forest.feature)} nodes)")
+    return out_path
+
+
+if __name__ == "__main__":
+    export_compact(sys.argv[1] if len(sys.argv) > 1 else "ml/risk_model.pkl")
@@ -0,0 +1,63 @@
+"""
+Re-screen stored KYC records with the risk model, in bounded-memory chunks.
+
+Usage:
+    python ml/score_batch.py records.csv scored.csv --chunksize 50000
+    python ml/score_batch.py records.parquet scored.csv
+
+Input needs the columns face_match_score, name_match_score, verhoeff_valid
+and blur_score; every input column is copied through and risk_score is appended.
+"""
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+
+# Allow running as a plain script from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.risk_model import predict_risk_frame, INPUT_COLUMNS
+
+
+def iter_chunks(path, chunksize):
+    if path.lower().endswith(".parquet"):
+        # Parquet is read one record batch at a time (needs pyarrow)
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def score_file(in_path, out_path, chunksize=50_000):
+    total = 0
+    start = time.perf_counter()
+
+    for i, chunk in enumerate(iter_chunks(in_path, chunksize)):
+        missing = [col for col in INPUT_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        chunk["risk_score"] = predict_risk_frame(chunk)
+        chunk.to_csv(out_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+        total += len(chunk)
+        print(f"Scored {total} records...")
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {total} records in {elapsed:.1f}s -> {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch risk scoring for stored KYC records")
+    parser.add_argument("input", help="CSV or Parquet file")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
+
+    score_file(args.input, args.output, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 import os
+import sys
 import joblib
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import roc_auc_score
 
+# Allow running as a plain script from the repo root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.risk_model import FEATURE_COLUMNS
+from ml.export_compact import export_compact
+
 
 def generate_synthetic_data(n=2000, random_state=42):
     rng = np.random.RandomState(random_state)
@@ -35,9 +42,12 @@ def train_and_save(path="ml/risk_model.pkl"):
     probs = clf.predict_proba(X_test)[:, 1]
     auc = roc_auc_score(y_test, probs)
 
-    joblib.dump(clf, path)
+    # Feature schema travels with the model and is checked at load time
+    joblib.dump({"model": clf, "features": FEATURE_COLUMNS}, path)
     print(f"Saved model to {path} (AUC={auc:.3f})")
 
+    export_compact(path)
+
 
 if __name__ == "__main__":
     train_and_save()
@@ -1,6 +1,7 @@
 # services/aadhaar_validator.py
 import re
-from utils.verhoeff import validate as verhoeff_validate
+import numpy as np
+from utils.verhoeff import validate as verhoeff_validate, char_codes, validate_codes
 
 def normalize_number(number: str) -> str:
     """Removes non-digit characters."""
@@ -13,9 +14,36 @@ def validate_aadhaar_number(number: str) -> bool:
         return False
     return verhoeff_validate(digits)
 
+def validate_aadhaar_numbers(numbers) -> np.ndarray:
+    """
+    Bulk validate_aadhaar_number over an array / list / pandas column.
+    Separators are stripped, then length + Verhoeff are checked in one vectorised pass.
+    Unlike the scalar version it also takes int columns (validated as their digits).
+    """
+    if len(numbers) == 0:
+        return np.zeros(0, dtype=bool)
+
+    numbers = np.asarray(numbers)
+    raw = char_codes(numbers)
+
+    # Normalise: stable-sort each row so digits keep their order and move to the front
+    is_digit = (raw >= 48) & (raw <= 57)
+    order = np.argsort(~is_digit, axis=1, kind="stable")
+    codes = np.take_along_axis(raw, order, axis=1)
+    digit_count = is_digit.sum(axis=1)
+    codes[np.arange(codes.shape[1]) >= digit_count[:, None]] = 0
+
+    valid = (digit_count == 12) & validate_codes(codes)
+
+    # Non-ASCII values (e.g. other scripts' digits, which \d accepts) take the scalar path
+    for i in np.flatnonzero((raw > 127).any(axis=1)):
+        valid[i] = validate_aadhaar_number(str(numbers[i]))
+
+    return valid
+
 def mask_aadhaar(number: str) -> str:
     """Returns XXXX-XXXX-1234 format."""
     digits = normalize_number(number)
     if len(digits) < 4:
         return "****"
-    return "XXXX-XXXX-" + digits[-4:]
\ No newline at end of file
+    return "XXXX-XXXX-" + digits[-4:]
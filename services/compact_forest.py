@@ -0,0 +1,151 @@
+# services/compact_forest.py
+import numpy as np
+
+# Format version written into every exported file
+COMPACT_FORMAT_VERSION = 1
+
+
+class CompactForest:
+    """
+    A RandomForestClassifier flattened into plain NumPy arrays.
+    All trees are walked together, one level per step, so scoring needs
+    neither sklearn nor a Python loop over trees.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.features = list(features)
+        self.n_features_in_ = len(self.features)
+
+    def predict_proba(self, X):
+        # sklearn compares float32 inputs against its thresholds; do the same
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_x = X.ravel()
+
+        # One cursor per (row, tree); only cursors not yet at a leaf are advanced
+        node = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        active = np.flatnonzero(self.left[node] >= 0)
+
+        while active.size:
+            current = node[active]
+            go_left = flat_x[row_offset[active] + self.feature[current]] <= self.threshold[current]
+            nxt = np.where(go_left, self.left[current], self.right[current])
+            node[active] = nxt
+            active = active[self.left[nxt] >= 0]
+
+        p1 = self.value[node].reshape(n_rows, n_trees).mean(axis=1)
+        return np.column_stack([1 - p1, p1])
+
+    def save(self, path, source_sha256=""):
+        np.savez(
+            path,
+            format_version=COMPACT_FORMAT_VERSION,
+            feature=self.feature, threshold=self.threshold,
+            left=self.left, right=self.right, value=self.value,
+            roots=self.roots,
+            features=np.array(self.features),
+            source_sha256=source_sha256
+        )
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """
+        mmap=True maps the node arrays read-only from the file instead of copying
+        them, so every worker on the node shares one copy through the page cache.
+        """
+        data = _load_npz_mmap(path) if mmap else np.load(path, allow_pickle=False)
+        if int(data["format_version"]) != COMPACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact model version {int(data['format_version'])}")
+
+        forest = cls(
+            data["feature"], data["threshold"], data["left"], data["right"],
+            data["value"], data["roots"], data["features"].tolist()
+        )
+        forest.source_sha256 = str(data["source_sha256"])
+        return forest
+
+
+def _load_npz_mmap(path):
+    """
+    np.load ignores mmap_mode for .npz, but np.savez stores members uncompressed,
+    so each member's array data sits at a fixed offset in the file and can be
+    mapped directly. Falls back to a normal read for compressed members.
+    """
+    import zipfile
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as fh:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # Local file header: 30 fixed bytes + file name + extra field
+            fh.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(fh.read(4), dtype="<u2")
+            fh.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+
+            version = np.lib.format.read_magic(fh)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(fh)
+            if dtype.hasobject:
+                raise ValueError(f"{name}: object arrays cannot be memory-mapped")
+
+            if not shape or dtype.kind == "U":
+                # Scalars and the short feature-name list: not worth a mapping
+                count = int(np.prod(shape)) if shape else 1
+                arrays[name] = np.frombuffer(fh.read(count * dtype.itemsize), dtype=dtype).reshape(shape)
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode="r", offset=fh.tell(), shape=shape,
+                    order="F" if fortran_order else "C"
+                )
+
+    return arrays
+
+
+def flatten_forest(clf, features):
+    """
+    Converts a fitted binary RandomForestClassifier into a CompactForest.
+    (Offline only - this is the one place that touches sklearn internals.)
+    """
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+
+        # Leaves get feature 0 so indexing stays in range; they never branch anyway
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(tree.threshold.astype(np.float64))
+        left.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+
+        # Per-node probability of class 1 (value may hold counts or fractions)
+        counts = tree.value[:, 0, :]
+        value.append(counts[:, 1] / counts.sum(axis=1))
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    return CompactForest(
+        np.concatenate(feature), np.concatenate(threshold),
+        np.concatenate(left), np.concatenate(right),
+        np.concatenate(value), np.array(roots, dtype=np.int32),
+        features
+    )
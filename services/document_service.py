@@ -0,0 +1,310 @@
+# services/document_service.py
+import os
+import cv2
+import logging
+import threading
+import numpy as np
+import fitz  # PyMuPDF for PDF handling
+from concurrent.futures import ThreadPoolExecutor
+
+from services.ocr_service import (
+    extract_aadhaar_text, extract_pan_text, extract_aadhaar_number_roi, extract_pan_number_roi,
+    extract_aadhaar_name_text
+)
+from services.image_preprocess import PDF_RENDER_DPI, MIN_BLUR_SCORE, normalize_document
+from services.upload_store import face_view_path, write_atomic
+from services import ocr_cache
+from services.metrics import timed, submit_in_context
+
+log = logging.getLogger(__name__)
+
+# Multi-page PDFs: how many pages we look at, and how far rendering runs ahead of OCR
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 5))
+PDF_PREFETCH_PAGES = int(os.environ.get("PDF_PREFETCH_PAGES", 1))
+
+# The PAN side of an upload runs on this one long-lived thread (per OCR process),
+# so its thread-local Tesseract handles are reused across jobs instead of being
+# rebuilt -- language data reloaded -- on a fresh thread for every upload.
+_pan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="doc-pan")
+
+# PyMuPDF must not be driven from several threads at once, and the Aadhaar and PAN
+# sides of an upload render concurrently: every fitz open/render/close holds this
+_fitz_lock = threading.Lock()
+
+
+# ------------------------------------------
+# HELPER: CONVERT PDF TO IMAGE
+# ------------------------------------------
+def _open_pdf(data):
+    with _fitz_lock:
+        return fitz.open(stream=data, filetype="pdf")
+
+
+def _close_pdf(doc):
+    with _fitz_lock:
+        doc.close()
+
+
+def _render_page(doc, page_no, dpi, doc_type="none"):
+    with timed("pdf_render", doc_type), _fitz_lock:
+        page = doc.load_page(page_no)
+        zoom = dpi / 72.0
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        samples, height, width, channels = pix.samples, pix.h, pix.w, pix.n
+
+    img_data = np.frombuffer(samples, dtype=np.uint8)
+    img_np = img_data.reshape(height, width, channels)
+
+    if channels == 3:
+        img_np = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
+    elif channels == 4: # RGBA
+        img_np = cv2.cvtColor(img_np, cv2.COLOR_RGBA2BGR)
+
+    return img_np
+
+
+def convert_pdf_to_image(data, ext, dpi=PDF_RENDER_DPI, doc_type="none"):
+    """
+    Decodes an in-memory upload (bytes) without touching the disk.
+    If file is PDF, renders the first page at `dpi` (PDF_RENDER_DPI by default).
+    If file is Image, decodes it directly from the buffer.
+    """
+    # CASE 1: PDF FILE
+    if ext == '.pdf':
+        doc = _open_pdf(data)
+        try:
+            return _render_page(doc, 0, dpi, doc_type)
+        finally:
+            _close_pdf(doc)
+
+    # CASE 2: NORMAL IMAGE
+    else:
+        # frombuffer is a view over the upload bytes, not a copy
+        with timed("image_decode", doc_type):
+            return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def iter_document_pages(data, ext, dpi=PDF_RENDER_DPI, max_pages=PDF_MAX_PAGES, doc_type="none"):
+    """
+    Yields (page_no, BGR image) lazily, in page order. Images yield one page.
+    For PDFs, the next PDF_PREFETCH_PAGES pages are rasterised on a background
+    thread while the caller inspects the current one; once the caller stops
+    (e.g. a valid number was found), no further pages are rendered.
+    """
+    if ext != '.pdf':
+        yield 0, convert_pdf_to_image(data, ext, dpi, doc_type)
+        return
+
+    doc = _open_pdf(data)
+    with _fitz_lock:
+        n_pages = min(doc.page_count, max_pages)
+
+    # One render thread per document; _fitz_lock serialises it with other documents
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+    try:
+        pending = []
+        next_page = 0
+        while next_page < n_pages and len(pending) <= PDF_PREFETCH_PAGES:
+            pending.append((next_page, submit_in_context(pool, _render_page, doc, next_page, dpi, doc_type)))
+            next_page += 1
+
+        while pending:
+            page_no, future = pending.pop(0)
+            image = future.result()
+
+            if next_page < n_pages:
+                pending.append((next_page, submit_in_context(pool, _render_page, doc, next_page, dpi, doc_type)))
+                next_page += 1
+
+            yield page_no, image
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        _close_pdf(doc)
+
+
+# ------------------------------------------
+# PER-DOCUMENT STEPS
+# ------------------------------------------
+def _analyse_aadhaar(upload):
+    """
+    Preprocessing + OCR for one Aadhaar upload, cached by content hash.
+    Walks PDF pages until one carries a Verhoeff-valid number (cheap ROI OCR);
+    if none does, the first sharp page gets the full-page OCR fallback.
+    Returns (ocr_aadhaar, doc_path_for_face); doc_path_for_face is None if every
+    page was rejected as blurry.
+    """
+    doc_path_for_face = face_view_path(upload.digest)
+
+    # Re-upload of a known document: skip conversion + OCR entirely
+    cached = ocr_cache.get("aadhaar", upload.digest)
+    if cached is not None and os.path.exists(doc_path_for_face):
+        log.info("✅ Aadhaar OCR served from cache")
+        return cached, doc_path_for_face
+
+    # A blank cover page scores ~0 on blur: the fallback is the first sharp page
+    seen, fallback, best_blur = False, None, 0.0
+    chosen, ocr_aadhaar = None, None
+
+    for page_no, image in iter_document_pages(upload.data, upload.ext, doc_type="aadhaar"):
+        if image is None:
+            continue
+
+        # Crop, resize, grayscale + blur score in one pass
+        with timed("preprocess", "aadhaar"):
+            views = normalize_document(image)
+        seen = True
+        best_blur = max(best_blur, views["blur_score"])
+        if views["blur_score"] < MIN_BLUR_SCORE:
+            continue
+        fallback = fallback or (page_no, views)
+
+        with timed("ocr_roi", "aadhaar"):
+            number, roi_text = extract_aadhaar_number_roi(views["gray"])
+        if number:
+            # Early exit: later pages are never rendered or OCR'd
+            chosen = views
+            # roi_text is only the digit band: the name match needs the name lines too
+            with timed("ocr_name_roi", "aadhaar"):
+                name_text = extract_aadhaar_name_text(views["gray"])
+            ocr_aadhaar = {"aadhaar_number": number, "full_text": roi_text, "name_text": name_text, "page": page_no}
+            break
+
+    if not seen:
+        raise ValueError("Unreadable image file")
+
+    if chosen is None:
+        if fallback is None:
+            # Every page is blurry: don't spend seconds of OCR on it
+            return {"blur_score": best_blur}, None
+
+        page_no, chosen = fallback
+        with timed("ocr_full_page", "aadhaar"):
+            ocr_aadhaar = extract_aadhaar_text(chosen["gray"], try_roi=False)
+        ocr_aadhaar["page"] = page_no
+
+    _, jpg = cv2.imencode(".jpg", chosen["face"])
+    write_atomic(doc_path_for_face, jpg.tobytes())
+
+    ocr_aadhaar["blur_score"] = chosen["blur_score"]
+
+    ocr_cache.put("aadhaar", upload.digest, ocr_aadhaar)
+    return ocr_aadhaar, doc_path_for_face
+
+
+def _analyse_pan(upload):
+    """
+    Preprocessing + OCR for one PAN upload, cached by content hash. Returns None if too blurry.
+    Like the Aadhaar path, PDF pages are checked with the cheap line detector first.
+    """
+    cached = ocr_cache.get("pan", upload.digest)
+    if cached is not None:
+        log.info("✅ PAN OCR served from cache")
+        return cached
+
+    seen, fallback = False, None
+
+    for page_no, image in iter_document_pages(upload.data, upload.ext, doc_type="pan"):
+        if image is None:
+            continue
+
+        with timed("preprocess", "pan"):
+            views = normalize_document(image, crop=False)
+        seen = True
+        if views["blur_score"] < MIN_BLUR_SCORE:
+            continue
+        fallback = fallback or (page_no, views)
+
+        with timed("ocr_roi", "pan"):
+            pan_number = extract_pan_number_roi(views["gray"])
+        if pan_number:
+            ocr_pan = {"pan_number": pan_number, "page": page_no, "blur_score": views["blur_score"]}
+            ocr_cache.put("pan", upload.digest, ocr_pan)
+            return ocr_pan
+
+    if not seen:
+        raise ValueError("Unreadable image file")
+    if fallback is None:
+        # Every page is blurry
+        return None
+
+    page_no, views = fallback
+    with timed("ocr_full_page", "pan"):
+        ocr_pan = extract_pan_text(views["gray"], try_roi=False)
+    ocr_pan["page"] = page_no
+    ocr_pan["blur_score"] = views["blur_score"]
+
+    ocr_cache.put("pan", upload.digest, ocr_pan)
+    return ocr_pan
+
+
+def _process_aadhaar(user, aadhaar):
+    errors = []
+    doc_path_for_face = None
+
+    try:
+        ocr_aadhaar, doc_path_for_face = _analyse_aadhaar(aadhaar)
+
+        if doc_path_for_face is None:
+            errors.append("❌ Aadhaar image is too blurry. Please upload a sharper photo or scan.")
+        elif not ocr_aadhaar["aadhaar_number"]:
+            errors.append("❌ Could not read Aadhaar Number.")
+        elif ocr_aadhaar["aadhaar_number"][-4:] != user["aadhaar_last4"]:
+            errors.append(f"❌ Aadhaar Mismatch: Found ...{ocr_aadhaar['aadhaar_number'][-4:]}")
+
+    except Exception as e:
+        errors.append(f"❌ Error processing Aadhaar: {str(e)}")
+        ocr_aadhaar = {}
+
+    return ocr_aadhaar, errors, doc_path_for_face
+
+
+def _process_pan(user, pan):
+    errors = []
+    ocr_pan = {"status": "SKIPPED", "pan_number": None}
+
+    if pan:
+        try:
+            result = _analyse_pan(pan)
+            if result is None:
+                errors.append("❌ PAN image is too blurry. Please upload a sharper photo or scan.")
+                return ocr_pan, errors
+
+            ocr_pan = result
+
+            if user["pan_number"]:
+                 if not ocr_pan["pan_number"]:
+                     errors.append("❌ Uploaded PAN but could not read number.")
+                 elif ocr_pan["pan_number"] != user["pan_number"]:
+                     errors.append(f"❌ PAN Mismatch: Found {ocr_pan['pan_number']}")
+        except Exception as e:
+            errors.append(f"❌ Error processing PAN: {str(e)}")
+
+    return ocr_pan, errors
+
+
+# ------------------------------------------
+# FULL UPLOAD PIPELINE (runs in an OCR worker process)
+# ------------------------------------------
+def process_documents(user, aadhaar, pan=None):
+    """
+    Converts + OCRs the uploaded documents (DocumentUpload tuples, decoded straight
+    from their in-memory bytes) and compares them with the user details.
+    Returns plain data (picklable) so it can cross the worker process boundary.
+    """
+    if pan:
+        # The two cards are independent: run them side by side. Tesseract and OpenCV
+        # release the GIL, so threads give real parallelism here.
+        pan_future = submit_in_context(_pan_executor, _process_pan, user, pan)
+        ocr_aadhaar, aadhaar_errors, doc_path_for_face = _process_aadhaar(user, aadhaar)
+        ocr_pan, pan_errors = pan_future.result()
+    else:
+        ocr_aadhaar, aadhaar_errors, doc_path_for_face = _process_aadhaar(user, aadhaar)
+        ocr_pan, pan_errors = _process_pan(user, None)
+
+    return {
+        # Same order as before: Aadhaar problems first, then PAN
+        "errors": aadhaar_errors + pan_errors,
+        "ocr_aadhaar": ocr_aadhaar,
+        "ocr_pan": ocr_pan,
+        "doc_path_for_face": doc_path_for_face
+    }
@@ -0,0 +1,156 @@
+# services/face_batcher.py
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+from services import face_engine
+from services.metrics import histogram
+
+# FACE_BATCHING=0 runs every embedding on the calling thread, one image per forward pass.
+# Batches need concurrent requests in one process (gunicorn.conf.py gives each worker
+# several threads while this is on); detection of a batch runs on the batcher thread.
+BATCHING_ENABLED = os.environ.get("FACE_BATCHING", "1") != "0"
+
+# Largest batch sent through the model in one forward pass
+MAX_BATCH_SIZE = int(os.environ.get("FACE_BATCH_MAX_SIZE", 8))
+
+# How long the first request of a batch waits for company. 0 adds no latency:
+# only requests that queued up during the previous forward pass are batched.
+MAX_WAIT_MS = float(os.environ.get("FACE_BATCH_MAX_WAIT_MS", 0))
+
+log = logging.getLogger(__name__)
+
+BATCH_SIZE = histogram(
+    "kyc_face_batch_size",
+    "Images per face-embedding forward pass.",
+    [],
+    buckets=(1, 2, 4, 8, 16, 32)
+)
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+class FaceBatcher:
+    """
+    Collects embedding requests from concurrent request threads and runs them
+    through `embed_many` together: a batch closes at `max_batch` images or
+    `max_wait_ms` after its first image, whichever comes first. Each caller
+    gets a Future for its own embedding.
+    """
+
+    def __init__(self, embed_many, max_batch=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self._embed_many = embed_many
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, image):
+        future = Future()
+        self._ensure_thread()
+        self._queue.put((image, future))
+        return future
+
+    def embed(self, image):
+        return self.submit(image).result()
+
+    def _ensure_thread(self):
+        # Started on first use: a thread started in the gunicorn master would not
+        # survive the fork (is_alive() is False in the child, so it is restarted)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="face-batcher", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(image, future) for image, future in self._next_batch() if future.set_running_or_notify_cancel()]
+            if batch:
+                try:
+                    self._process(batch)
+                except Exception:
+                    # Futures are already failed by _process; keep the thread alive
+                    log.exception("❌ Face batch failed")
+
+    def _process(self, batch):
+        BATCH_SIZE.observe(len(batch))
+        try:
+            try:
+                embeddings = list(self._embed_many([image for image, _ in batch]))
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    return
+                # One bad frame must not fail the others: retry them one by one
+                log.warning("⚠️ Batched embedding failed (%s), retrying %d images singly", e, len(batch))
+                for image, future in batch:
+                    self._process_single(image, future)
+                return
+
+            if len(embeddings) != len(batch):
+                log.error("❌ embed_many returned %d embeddings for %d images", len(embeddings), len(batch))
+                return
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+        finally:
+            # Whatever went wrong above, no caller is left waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Face embedding produced no result for this image"))
+
+    def _process_single(self, image, future):
+        try:
+            embeddings = list(self._embed_many([image]))
+            if len(embeddings) != 1:
+                raise RuntimeError(f"embed_many returned {len(embeddings)} embeddings for 1 image")
+            future.set_result(embeddings[0])
+        except Exception as e:
+            future.set_exception(e)
+
+
+def get_batcher():
+    """
+    This worker's batcher around face_engine.embed_many, created on first use.
+    """
+    global _batcher
+
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = FaceBatcher(face_engine.embed_many)
+                log.info("🧺 Face batching: up to %d images, %g ms window", _batcher.max_batch, MAX_WAIT_MS)
+
+    return _batcher
+
+
+def embed(image):
+    """
+    face_engine.embed() through the batcher (or directly if FACE_BATCHING=0).
+    """
+    if not BATCHING_ENABLED:
+        return face_engine.embed(image)
+    return get_batcher().embed(image)
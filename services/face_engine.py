@@ -0,0 +1,167 @@
+# services/face_engine.py
+import os
+import logging
+import threading
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# ------------------------------------------
+# BACKEND REGISTRY
+# ------------------------------------------
+# DeepFace recognition models: cosine threshold (DeepFace's defaults), input size
+# and approximate weight file size, i.e. the per-worker memory cost of the choice.
+FACE_MODELS = {
+    "VGG-Face":     {"threshold": 0.68,  "input": (224, 224), "weights_mb": 580},
+    "Facenet":      {"threshold": 0.40,  "input": (160, 160), "weights_mb": 90},
+    "Facenet512":   {"threshold": 0.30,  "input": (160, 160), "weights_mb": 95},
+    "ArcFace":      {"threshold": 0.68,  "input": (112, 112), "weights_mb": 137},
+    "SFace":        {"threshold": 0.593, "input": (112, 112), "weights_mb": 37},
+    "GhostFaceNet": {"threshold": 0.65,  "input": (112, 112), "weights_mb": 17},
+    "OpenFace":     {"threshold": 0.10,  "input": (96, 96),   "weights_mb": 15},
+    "Dlib":         {"threshold": 0.07,  "input": (150, 150), "weights_mb": 22},
+    "DeepID":       {"threshold": 0.015, "input": (55, 47),   "weights_mb": 2},
+}
+
+# DeepFace detector backends as registered in deepface 0.0.96 (deepface/modules/modeling.py),
+# plus "skip"; some need their own package (e.g. mtcnn, retina-face, ultralytics, facenet-pytorch)
+FACE_DETECTORS = (
+    "opencv", "ssd", "mtcnn", "fastmtcnn", "retinaface", "mediapipe", "yunet", "centerface", "dlib",
+    "yolov8n", "yolov8m", "yolov8l", "yolov11n", "yolov11s", "yolov11m", "yolov11l",
+    "yolov12n", "yolov12s", "yolov12m", "yolov12l", "skip",
+)
+
+
+def resolve_backend(model_name, detector_backend, threshold=None):
+    """
+    Validates a model/detector pair against the registry and returns
+    (model_name, detector_backend, cosine_threshold).
+    """
+    if model_name not in FACE_MODELS:
+        raise ValueError(f"Unknown FACE_MODEL: {model_name} (choose from {', '.join(FACE_MODELS)})")
+    if detector_backend not in FACE_DETECTORS:
+        raise ValueError(f"Unknown FACE_DETECTOR: {detector_backend} (choose from {', '.join(FACE_DETECTORS)})")
+
+    if threshold is None:
+        threshold = FACE_MODELS[model_name]["threshold"]
+    return model_name, detector_backend, float(threshold)
+
+
+# Model + detector used for every comparison in this worker (FACE_MODEL / FACE_DETECTOR);
+# FACE_COSINE_THRESHOLD overrides the model's default match threshold
+MODEL_NAME, DETECTOR_BACKEND, COSINE_THRESHOLD = resolve_backend(
+    os.environ.get("FACE_MODEL", "VGG-Face"),
+    os.environ.get("FACE_DETECTOR", "opencv"),
+    os.environ.get("FACE_COSINE_THRESHOLD"),
+)
+
+_model = None
+_ready = threading.Event()
+_load_lock = threading.Lock()
+
+
+def _deepface():
+    # Deferred: importing deepface pulls in TensorFlow/Keras (seconds of startup)
+    from deepface import DeepFace
+    return DeepFace
+
+
+# ------------------------------------------
+# STARTUP / WARM-UP
+# ------------------------------------------
+def load_engine():
+    """
+    Loads the embedding model and face detector once for this worker,
+    then runs one warm-up inference so the first real request does not
+    pay for graph building.
+    """
+    global _model
+
+    with _load_lock:
+        if _ready.is_set():
+            return _model
+
+        log.info("🧠 Loading face engine (%s + %s)...", MODEL_NAME, DETECTOR_BACKEND)
+        DeepFace = _deepface()
+        _model = DeepFace.build_model(MODEL_NAME)
+
+        # Warm-up: blank frame runs the detector and one forward pass
+        height, width = FACE_MODELS[MODEL_NAME]["input"]
+        dummy = np.zeros((max(height, 224), max(width, 224), 3), dtype=np.uint8)
+        DeepFace.represent(
+            dummy,
+            model_name=MODEL_NAME,
+            detector_backend=DETECTOR_BACKEND,
+            enforce_detection=False
+        )
+
+        _ready.set()
+        log.info("✅ Face engine ready")
+        return _model
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+# ------------------------------------------
+# EMBED / COMPARE
+# ------------------------------------------
+def embed(image):
+    """
+    Detects the most prominent face in `image` (BGR numpy array, as
+    returned by cv2) and returns its embedding.
+    """
+    if not _ready.is_set():
+        load_engine()
+
+    faces = _deepface().represent(
+        image,
+        model_name=MODEL_NAME,
+        detector_backend=DETECTOR_BACKEND,
+        enforce_detection=False
+    )
+    return _largest_face_embedding(faces)
+
+
+def embed_many(images):
+    """
+    embed() for several images: faces are still detected image by image, but
+    all crops go through the recognition model in one forward pass.
+    """
+    images = list(images)
+    if len(images) == 1:
+        return [embed(images[0])]
+
+    if not _ready.is_set():
+        load_engine()
+
+    # A list input returns one face list per image (deepface >= 0.0.94)
+    per_image = _deepface().represent(
+        images,
+        model_name=MODEL_NAME,
+        detector_backend=DETECTOR_BACKEND,
+        enforce_detection=False
+    )
+    return [_largest_face_embedding(faces) for faces in per_image]
+
+
+def _largest_face_embedding(faces):
+    # Largest detected face wins (ID cards may contain a ghost photo)
+    best = max(faces, key=lambda f: f["facial_area"]["w"] * f["facial_area"]["h"])
+    return np.asarray(best["embedding"], dtype=np.float32)
+
+
+def compare(emb_a, emb_b):
+    """
+    Returns (is_match, cosine_distance) for two embeddings.
+    """
+    a = np.asarray(emb_a, dtype=np.float32)
+    b = np.asarray(emb_b, dtype=np.float32)
+
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    if denom == 0:
+        return False, 1.0
+
+    distance = float(1 - np.dot(a, b) / denom)
+    return distance <= COSINE_THRESHOLD, distance
@@ -0,0 +1,112 @@
+# services/face_quality.py
+import os
+import logging
+import threading
+
+import cv2
+
+from services.image_preprocess import blur_score_of, fit_max_side
+
+# FACE_QUALITY_GATE=0 sends every selfie straight to the embedding model
+QUALITY_GATE_ENABLED = os.environ.get("FACE_QUALITY_GATE", "1") != "0"
+
+# Checks run on a small copy of the frame; Haar detection cost scales with area
+QUALITY_MAX_SIDE = int(os.environ.get("FACE_QUALITY_MAX_SIDE", 240))
+
+# Face width as a fraction of the frame width below which the user must move closer
+MIN_FACE_FRACTION = float(os.environ.get("FACE_MIN_SIZE_FRACTION", 0.12))
+
+# Laplacian variance of the face crop normalised to FACE_CROP_SIDE px, so the score
+# does not depend on camera resolution (20 ~ blur of 3-4% of the face width)
+FACE_CROP_SIDE = 64
+MIN_FACE_BLUR_SCORE = float(os.environ.get("FACE_MIN_BLUR_SCORE", 20))
+
+# Mean gray level of the face crop
+MIN_FACE_BRIGHTNESS = float(os.environ.get("FACE_MIN_BRIGHTNESS", 40))
+MAX_FACE_BRIGHTNESS = float(os.environ.get("FACE_MAX_BRIGHTNESS", 220))
+
+REASONS = {
+    "no_face": "No face detected. Look straight at the camera, close enough that your face fills much of the frame.",
+    "face_too_small": "Your face is too small in the frame. Move closer to the camera.",
+    "too_blurry": "The photo is blurry. Hold still and try again.",
+    "too_dark": "The photo is too dark. Move to a brighter place.",
+    "too_bright": "The photo is overexposed. Avoid direct light behind or on the camera.",
+}
+
+log = logging.getLogger(__name__)
+
+# Same frontal-face cascade DeepFace's "opencv" detector uses
+_CASCADE_PATH = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+
+# CascadeClassifier is not safe to share between threads
+_local = threading.local()
+
+
+def _cascade():
+    """
+    This thread's detector, or None if this OpenCV build has no Haar cascades
+    (the gate then lets every frame through rather than blocking verification).
+    """
+    if not hasattr(_local, "cascade"):
+        cascade = None
+        if hasattr(cv2, "CascadeClassifier"):
+            cascade = cv2.CascadeClassifier(_CASCADE_PATH)
+            if cascade.empty():
+                cascade = None
+        if cascade is None:
+            log.warning("⚠️ Haar face cascade unavailable, selfie quality gate disabled")
+        _local.cascade = cascade
+    return _local.cascade
+
+
+def _result(code, **details):
+    return {"ok": code is None, "code": code, "reason": REASONS.get(code), **details}
+
+
+def check_face_quality(image):
+    """
+    Cheap first stage before embedding: detects faces on a downscaled gray copy
+    and checks face size, sharpness and exposure of the largest one.
+    Returns {"ok", "code", "reason", ...measurements}; reason is user-facing.
+    """
+    cascade = _cascade()
+    if cascade is None:
+        return _result(None, skipped=True)
+
+    small = fit_max_side(image, QUALITY_MAX_SIDE)
+    gray = small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape[:2]
+
+    # Detect with a low size floor so "too small" and "no face" can be told apart
+    min_side = max(20, int(min(height, width) * 0.06))
+    faces, votes = cascade.detectMultiScale2(
+        cv2.equalizeHist(gray), scaleFactor=1.15, minNeighbors=5, minSize=(min_side, min_side)
+    )
+    if len(faces) == 0:
+        return _result("no_face")
+
+    # Most neighbour votes = most confident; background false positives get few
+    x, y, w, h = (int(v) for v in faces[max(range(len(faces)), key=lambda i: votes[i])])
+
+    face_fraction = w / float(width)
+    if face_fraction < MIN_FACE_FRACTION:
+        return _result("face_too_small", face_fraction=round(face_fraction, 3))
+
+    crop = cv2.resize(gray[y:y + h, x:x + w], (FACE_CROP_SIDE, FACE_CROP_SIDE), interpolation=cv2.INTER_AREA)
+    sharpness = blur_score_of(crop)
+    brightness = float(crop.mean())
+    measurements = {
+        "face_fraction": round(face_fraction, 3),
+        "blur_score": round(sharpness, 1),
+        "brightness": round(brightness, 1),
+    }
+
+    # Exposure first: a dark frame also scores low on sharpness
+    if brightness < MIN_FACE_BRIGHTNESS:
+        return _result("too_dark", **measurements)
+    if brightness > MAX_FACE_BRIGHTNESS:
+        return _result("too_bright", **measurements)
+    if sharpness < MIN_FACE_BLUR_SCORE:
+        return _result("too_blurry", **measurements)
+
+    return _result(None, **measurements)
@@ -1,64 +1,146 @@
-from deepface import DeepFace
-import cv2
-import numpy as np
 import os
+import uuid
+import cv2
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from services import face_engine, face_batcher
+from services.face_quality import QUALITY_GATE_ENABLED, check_face_quality
+from services.metrics import timed, submit_in_context
+from utils.ttl_cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+# ID-card embeddings computed at upload time, keyed by an opaque id kept in the session.
+# Selfie retries then cost one embedding + one vector comparison.
+_doc_embeddings = TTLCache(
+    max_items=int(os.environ.get("DOC_FACE_CACHE_SIZE", 2048)),
+    ttl_seconds=int(os.environ.get("DOC_FACE_CACHE_TTL", 1800))
+)
+
+# Background embedding of ID cards once their OCR job finishes
+_embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="doc-face")
+
+
+def _match_result(emb_id, emb_selfie):
+    is_match, distance = face_engine.compare(emb_id, emb_selfie)
+
+    # Calculate a simple accuracy score (0-100%)
+    # Cosine distance is usually between 0 (exact) and 1 (diff).
+    # We invert it to get "Similarity".
+    accuracy_score = round((1 - distance) * 100, 2)
+
+    log.info("✅ Face Result: Match=%s, Dist=%.4f, Score=%s%%", is_match, distance, accuracy_score)
+
+    return {
+        "match": is_match,
+        "score": accuracy_score,
+        "error": None
+    }
+
+
+def _error_result(e):
+    log.error("❌ DeepFace Error: %s", e)
+    return {
+        "match": False, 
+        "score": 0, 
+        "error": f"Face check failed: {str(e)}"
+    }
+
+
+def _quality_rejection(selfie_image):
+    """
+    Runs the cheap selfie checks; returns a result to send back instead of
+    embedding, or None if the frame may go to the model.
+    """
+    if not QUALITY_GATE_ENABLED:
+        return None
+
+    with timed("face_quality", "selfie"):
+        quality = check_face_quality(selfie_image)
+    if quality["ok"]:
+        return None
+
+    log.info("⚠️ Selfie rejected before embedding: %s", quality["code"])
+    return {
+        "match": False,
+        "score": 0,
+        "error": quality["reason"],
+        "quality_issue": quality["code"]
+    }
+
+
+def _embed(image, doc_type):
+    # Through the batcher: concurrent requests share one forward pass
+    with timed("face_embed", doc_type):
+        return face_batcher.embed(image)
+
+
+def _embed_document_path(doc_path):
+    img_doc = cv2.imread(doc_path)
+    if img_doc is None:
+        raise ValueError("ID card image expired. Please upload again.")
+    return _embed(img_doc, "id_card")
+
+
+def prime_document_face(doc_path):
+    """
+    Detects + embeds the stored ID-card face once, in the background.
+    Returns the cache key straight away; lookups wait on the pending result.
+    """
+    key = uuid.uuid4().hex
+    _doc_embeddings.set(key, submit_in_context(_embed_executor, _embed_document_path, doc_path))
+    return key
+
+
+def _cached_document_embedding(doc_key):
+    emb_id = _doc_embeddings.get(doc_key) if doc_key else None
+    if isinstance(emb_id, Future):
+        try:
+            emb_id = emb_id.result()
+        except Exception as e:
+            log.warning("⚠️ Background ID face embedding failed: %s", e)
+            return None
+    return emb_id
+
 
 def verify_face_match(id_card_image, selfie_image):
     """
-    Verifies if the ID Card photo matches the Selfie using DeepFace.
+    Verifies if the ID Card photo matches the Selfie using the warm face engine.
+    Both images are BGR numpy arrays; nothing touches the disk.
     """
-    temp_id_path = "temp_id_card.jpg"
-    temp_selfie_path = "temp_selfie.jpg"
+    try:
+        rejection = _quality_rejection(selfie_image)
+        if rejection:
+            return rejection
+
+        emb_id = _embed(id_card_image, "id_card")
+        emb_selfie = _embed(selfie_image, "selfie")
+        return _match_result(emb_id, emb_selfie)
+
+    except Exception as e:
+        return _error_result(e)
+
 
+def verify_against_document(doc_key, doc_path, selfie_image):
+    """
+    Same as verify_face_match, but reuses the ID-card embedding cached at upload.
+    Falls back to re-embedding the stored document if the entry expired or was
+    computed on another worker.
+    """
     try:
-        # 1. Save images to disk temporarily
-        # DeepFace works much better with file paths than numpy arrays
-        cv2.imwrite(temp_id_path, id_card_image)
-        cv2.imwrite(temp_selfie_path, selfie_image)
-
-        print("--- 🧠 Running DeepFace AI Analysis... ---")
-        
-        # 2. Run Verification
-        # FIX: We pass the paths as the first two arguments directly (Positional Arguments)
-        # This prevents the "unexpected keyword argument" error.
-        result = DeepFace.verify(
-            temp_id_path,           # First image (ID)
-            temp_selfie_path,       # Second image (Selfie)
-            model_name = "VGG-Face",
-            detector_backend = "opencv", 
-            distance_metric = "cosine",
-            enforce_detection = False 
-        )
-        
-        # 3. Cleanup temp files
-        if os.path.exists(temp_id_path): os.remove(temp_id_path)
-        if os.path.exists(temp_selfie_path): os.remove(temp_selfie_path)
-
-        # 4. Process Results
-        distance = result['distance']
-        is_match = result['verified']
-        
-        # Calculate a simple accuracy score (0-100%)
-        # Cosine distance is usually between 0 (exact) and 1 (diff).
-        # We invert it to get "Similarity".
-        accuracy_score = round((1 - distance) * 100, 2)
-
-        print(f"✅ Face Result: Match={is_match}, Dist={distance}, Score={accuracy_score}%")
-
-        return {
-            "match": is_match,
-            "score": accuracy_score,
-            "error": None
-        }
+        # Reject unusable selfies before touching either embedding
+        rejection = _quality_rejection(selfie_image)
+        if rejection:
+            return rejection
+
+        emb_id = _cached_document_embedding(doc_key)
+        if emb_id is None:
+            emb_id = _embed_document_path(doc_path)
+            if doc_key:
+                _doc_embeddings.set(doc_key, emb_id)
+
+        emb_selfie = _embed(selfie_image, "selfie")
+        return _match_result(emb_id, emb_selfie)
 
     except Exception as e:
-        print(f"❌ DeepFace Error: {e}")
-        # Cleanup in case of error
-        if os.path.exists(temp_id_path): os.remove(temp_id_path)
-        if os.path.exists(temp_selfie_path): os.remove(temp_selfie_path)
-        
-        return {
-            "match": False, 
-            "score": 0, 
-            "error": f"Face check failed: {str(e)}"
-        }
\ No newline at end of file
+        return _error_result(e)
@@ -1,24 +1,112 @@
 # services/image_preprocess.py
+import os
 import cv2
 import numpy as np
 
-def enhance_card_image(image):
+# ------------------------------------------
+# RESOLUTION BUDGETS (per downstream consumer)
+# ------------------------------------------
+# PDFs are rasterised at a fixed DPI instead of PyMuPDF's 72 DPI default
+PDF_RENDER_DPI = int(os.environ.get("PDF_RENDER_DPI", 200))
+
+# Tesseract cost scales with pixel area; ~2.5 MP keeps card text at 30px+ glyphs
+OCR_MAX_PIXELS = int(os.environ.get("OCR_MAX_PIXELS", 2_500_000))
+
+# Face detectors resize internally anyway; anything above ~1 MP is wasted work
+FACE_MAX_PIXELS = int(os.environ.get("FACE_MAX_PIXELS", 1_000_000))
+
+# Selfies: the browser scales frames so the longer side fits this before upload
+# (VGG-Face works on a 224px crop; 640px leaves the detector enough face pixels)
+SELFIE_MAX_SIDE = int(os.environ.get("SELFIE_MAX_SIDE", 640))
+
+# Documents below this Laplacian variance are rejected before OCR runs
+MIN_BLUR_SCORE = float(os.environ.get("MIN_BLUR_SCORE", 20))
+
+
+def crop_card_region(image):
     """
-    1. Detects if image is a full A4 page (Portrait) -> Crops bottom 40%.
-    2. Detects blur -> Sharpens if needed.
+    If height is significantly larger than width (Portrait mode A4 scan),
+    returns the bottom 40% where the e-Aadhaar card sits. Otherwise unchanged.
     """
-    height, width, _ = image.shape
-    
-    # 1. SMART CROP (Fixes "Full Page" issue)
-    # If height is significantly larger than width (Portrait mode A4 scan)
+    height, width = image.shape[:2]
+
     if height > width * 1.4:
         # The card is usually at the bottom of the e-Aadhaar letter
         crop_start = int(height * 0.60)
         image = image[crop_start:height, 0:width]
+
+    return image
+
+
+def fit_pixel_budget(image, max_pixels):
+    """
+    Downscales (never upscales) so that width * height <= max_pixels.
+    """
+    height, width = image.shape[:2]
+    if height * width <= max_pixels:
+        return image
+
+    scale = (max_pixels / float(height * width)) ** 0.5
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def fit_max_side(image, max_side):
+    """
+    Downscales (never upscales) so that the longer side is <= max_side.
+    """
+    height, width = image.shape[:2]
+    if max(height, width) <= max_side:
+        return image
+
+    scale = max_side / float(max(height, width))
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def blur_score_of(gray):
+    """
+    Variance of the Laplacian: low = blurry (or blank), high = sharp.
+    """
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def normalize_document(image, crop=True):
+    """
+    Single pass over an uploaded document: crop once, then derive one view per consumer.
+    Returns {
+        "ocr":  BGR image within OCR_MAX_PIXELS,
+        "gray": grayscale of the OCR view (what Tesseract gets),
+        "face": BGR image within FACE_MAX_PIXELS,
+        "blur_score": Laplacian variance measured on the gray OCR view
+    }
+    """
+    card = crop_card_region(image) if crop else image
+    ocr_view = fit_pixel_budget(card, OCR_MAX_PIXELS)
+    gray = cv2.cvtColor(ocr_view, cv2.COLOR_BGR2GRAY)
+
+    # Face view is derived from the (smaller) OCR view when possible
+    face_view = fit_pixel_budget(ocr_view, FACE_MAX_PIXELS)
+
+    return {
+        "ocr": ocr_view,
+        "gray": gray,
+        "face": face_view,
+        "blur_score": blur_score_of(gray)
+    }
+
+
+def enhance_card_image(image):
+    """
+    1. Detects if image is a full A4 page (Portrait) -> Crops bottom 40%.
+    2. Detects blur -> Sharpens if needed.
+    """
+    # 1. SMART CROP (Fixes "Full Page" issue)
+    image = crop_card_region(image)
         
     # 2. BLUR DETECTION & SHARPENING
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    blur_score = cv2.Laplacian(gray, cv2.CV_64F).var()
+    blur_score = blur_score_of(gray)
     
     # If blur_score is low (blurry), but not too low (blank page)
     # We apply a sharpening kernel
@@ -26,4 +114,4 @@ def enhance_card_image(image):
         kernel = np.array([[0, -1, 0], [-1, 5,-1], [0, -1, 0]])
         image = cv2.filter2D(image, -1, kernel)
         
-    return image, blur_score
\ No newline at end of file
+    return image, blur_score
@@ -0,0 +1,154 @@
+# services/jobs.py
+import os
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services import metrics
+from utils.request_log import configure_logging, request_id_var
+from utils.ttl_cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+# OCR is CPU-bound (Tesseract + OpenCV), so it runs in its own process pool,
+# sized independently of the web workers.
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+
+# Finished jobs are kept around long enough for the page to poll them
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", 900))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Futures of the jobs this web worker submitted
+_jobs = TTLCache(max_items=4096, ttl_seconds=JOB_TTL_SECONDS)
+
+# Status + result of every job, in the session backend: with SESSION_BACKEND=sqlite
+# a poll that lands on another gunicorn worker still finds the job
+_job_states = None
+_job_states_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    # Locked: concurrent first uploads (threaded workers) must not each create a pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" keeps the workers free of the parent's TensorFlow / thread state
+            _pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _discard_pool(pool):
+    """
+    Drops a pool that broke (an OCR process died, e.g. OOM-killed); the next
+    submit starts a fresh one. No-op if it was already replaced.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    log.warning("⚠️ OCR process pool broken, starting a new one")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_job(request_id, fn, *args):
+    """
+    Runs in the worker process: carries the request id into the logs and ships
+    the stage timings back with the result (the worker's own metrics are never scraped).
+    """
+    configure_logging()
+    request_id_var.set(request_id)
+
+    start = time.perf_counter()
+    with metrics.collect_timings() as timings:
+        result = fn(*args)
+    log.info("job=%s duration_ms=%.1f", fn.__name__, (time.perf_counter() - start) * 1000)
+
+    return {"result": result, "timings": timings}
+
+
+def _job_store():
+    global _job_states
+    with _job_states_lock:
+        if _job_states is None:
+            # Imported here: OCR processes unpickle _run_job from this module and
+            # must not pull in Flask through the session store
+            from services.session_store import create_store
+            _job_states = create_store(table="kyc_jobs", ttl_seconds=JOB_TTL_SECONDS)
+        return _job_states
+
+
+def _state_of(future):
+    if not future.done():
+        return {"status": "running" if future.running() else "queued"}
+
+    error = future.exception()
+    if error is not None:
+        return {"status": "failed", "error": str(error)}
+
+    return {"status": "done", "result": future.result()["result"]}
+
+
+def _record_job_timings(future):
+    if not future.cancelled() and future.exception() is None:
+        metrics.record_timings(future.result()["timings"])
+
+
+def _submit(request_id, fn, *args):
+    pool = _get_pool()
+    try:
+        future = pool.submit(_run_job, request_id, fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        pool = _get_pool()
+        future = pool.submit(_run_job, request_id, fn, *args)
+
+    def _check_pool(done):
+        if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+            _discard_pool(pool)
+
+    future.add_done_callback(_check_pool)
+    return future
+
+
+def submit_job(fn, *args):
+    """
+    Queues fn(*args) on the OCR pool and returns the job id.
+    """
+    job_id = uuid.uuid4().hex
+    store = _job_store()
+    store.save(job_id, {"status": "queued"})
+
+    future = _submit(request_id_var.get(), fn, *args)
+    future.add_done_callback(_record_job_timings)
+
+    def _publish(done):
+        try:
+            store.save(job_id, _state_of(done))
+        except Exception as e:
+            log.error("❌ Could not store result of job %s: %s", job_id, e)
+
+    future.add_done_callback(_publish)
+    _jobs.set(job_id, future)
+    return job_id
+
+
+def get_job(job_id):
+    """
+    Returns {"status": "queued" | "running" | "done" | "failed", ...} or None if unknown.
+    """
+    # Submitted here: the future is the freshest source (and tells queued from running)
+    future = _jobs.get(job_id)
+    if future is not None:
+        return _state_of(future)
+
+    return _job_store().load(job_id)
@@ -0,0 +1,207 @@
+# services/metrics.py
+import os
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Seconds; covers cache hits (ms) up to multi-page full-page OCR (tens of seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+# Set while a job runs in an OCR worker: stage timings are shipped back with the result
+_collector = contextvars.ContextVar("stage_collector", default=None)
+
+
+# ------------------------------------------
+# HISTOGRAMS
+# ------------------------------------------
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus data model, one series per label set.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (+Inf last), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _labels(self, key, extra=None):
+        pairs = list(zip(self.label_names, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+
+        return "\n".join(lines)
+
+
+def histogram(name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+    """
+    Returns the registered histogram `name`, creating it on first use.
+    """
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = Histogram(name, help_text, label_names, buckets)
+        return metric
+
+
+STAGE_SECONDS = histogram(
+    "kyc_stage_duration_seconds",
+    "Time spent in one KYC pipeline stage.",
+    ["stage", "doc_type"]
+)
+
+REQUEST_SECONDS = histogram(
+    "kyc_http_request_duration_seconds",
+    "HTTP request latency by endpoint.",
+    ["endpoint", "method", "status"]
+)
+
+
+# ------------------------------------------
+# TIMING SPANS
+# ------------------------------------------
+@contextmanager
+def timed(stage, doc_type="none"):
+    """
+    Times the enclosed block as one pipeline stage:
+        with timed("ocr", "aadhaar"): ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage, doc_type=doc_type)
+
+        timings = _collector.get()
+        if timings is not None:
+            timings.append((stage, doc_type, elapsed))
+
+        log.debug("stage=%s doc_type=%s duration_ms=%.1f", stage, doc_type, elapsed * 1000)
+
+
+@contextmanager
+def collect_timings():
+    """
+    Collects every timed() span of the enclosed block (including threads started
+    through submit_in_context) as (stage, doc_type, seconds) tuples.
+    """
+    timings = []
+    token = _collector.set(timings)
+    try:
+        yield timings
+    finally:
+        _collector.reset(token)
+
+
+def record_timings(timings):
+    """
+    Folds stage timings measured in another process into this process's histograms.
+    """
+    for stage, doc_type, seconds in timings:
+        STAGE_SECONDS.observe(seconds, stage=stage, doc_type=doc_type)
+
+
+def submit_in_context(pool, fn, *args):
+    """
+    pool.submit() that carries the caller's request id and timing collector into the thread.
+    """
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+# ------------------------------------------
+# PROCESS MEMORY
+# ------------------------------------------
+# smaps_rollup fields summed into each reported kind
+_SMAPS_FIELDS = {"Rss": "rss", "Pss": "pss", "Private_Clean": "uss", "Private_Dirty": "uss"}
+
+
+def process_memory(pid="self"):
+    """
+    {"rss", "pss", "uss"} in bytes from /proc/<pid>/smaps_rollup, or None where
+    that is unavailable (non-Linux, kernel < 4.14). USS counts only pages no
+    other process maps, i.e. what one more gunicorn worker actually costs.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as fh:
+            lines = fh.readlines()
+    except OSError:
+        return None
+
+    usage = {"rss": 0, "pss": 0, "uss": 0}
+    for line in lines:
+        field, _, rest = line.partition(":")
+        kind = _SMAPS_FIELDS.get(field)
+        if kind:
+            usage[kind] += int(rest.split()[0]) * 1024  # values are in kB
+    return usage
+
+
+def _render_process_memory():
+    usage = process_memory()
+    if usage is None:
+        return None
+
+    pid = os.getpid()
+    lines = [
+        "# HELP kyc_process_memory_bytes Memory of this worker process (rss, pss, uss = private pages).",
+        "# TYPE kyc_process_memory_bytes gauge",
+    ]
+    for kind, value in usage.items():
+        lines.append(f'kyc_process_memory_bytes{{kind="{kind}",pid="{pid}"}} {value}')
+    return "\n".join(lines)
+
+
+def render_latest():
+    """
+    All registered metrics in the Prometheus text exposition format.
+    """
+    with _registry_lock:
+        metrics = list(_registry.values())
+    parts = [metric.render() for metric in metrics]
+
+    memory = _render_process_memory()
+    if memory:
+        parts.append(memory)
+    return "\n".join(parts) + "\n"
@@ -0,0 +1,82 @@
+# services/ocr_cache.py
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+# Persistent content-hash -> OCR/preprocessing result cache, shared by all OCR workers
+OCR_CACHE_PATH = os.environ.get("OCR_CACHE_PATH", "ocr_cache.sqlite3")
+OCR_CACHE_MAX_BYTES = int(os.environ.get("OCR_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Bump when the OCR pipeline changes so old results stop matching
+OCR_CACHE_VERSION = 6
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(OCR_CACHE_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def _key(kind, digest):
+    return f"{kind}:{digest}:v{OCR_CACHE_VERSION}"
+
+
+def get(kind, digest):
+    """
+    Cached result for this document kind ("aadhaar" / "pan") + content hash, or None.
+    """
+    try:
+        with _conn() as conn:
+            row = conn.execute(
+                "SELECT data FROM ocr_results WHERE key = ?", (_key(kind, digest),)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE ocr_results SET last_used = ? WHERE key = ?", (time.time(), _key(kind, digest))
+            )
+            return json.loads(row[0])
+    except sqlite3.Error as e:
+        # The cache is an optimisation; never fail an upload because of it
+        log.warning("⚠️ OCR cache read failed: %s", e)
+        return None
+
+
+def put(kind, digest, result):
+    data = json.dumps(result)
+    try:
+        with _conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, data, size, last_used) VALUES (?, ?, ?, ?)",
+                (_key(kind, digest), data, len(data), time.time())
+            )
+            _evict(conn)
+    except sqlite3.Error as e:
+        log.warning("⚠️ OCR cache write failed: %s", e)
+
+
+def _evict(conn):
+    # Size-based eviction: drop least recently used entries until under budget
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_results").fetchone()[0]
+    if total <= OCR_CACHE_MAX_BYTES:
+        return
+
+    for key, size in conn.execute("SELECT key, size FROM ocr_results ORDER BY last_used").fetchall():
+        conn.execute("DELETE FROM ocr_results WHERE key = ?", (key,))
+        total -= size
+        if total <= OCR_CACHE_MAX_BYTES:
+            break
@@ -0,0 +1,161 @@
+# services/ocr_engine.py
+import os
+import logging
+import threading
+
+import numpy as np
+
+# auto (tesserocr if installed, else pytesseract) | tesserocr | pytesseract
+OCR_ENGINE = os.environ.get("OCR_ENGINE", "auto").lower()
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+
+# pytesseract only: path to the tesseract binary when it is not on PATH (e.g. on Windows)
+TESSERACT_CMD = os.environ.get("TESSERACT_CMD")
+
+log = logging.getLogger(__name__)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# ------------------------------------------
+# ENGINES
+# ------------------------------------------
+class TesserocrEngine:
+    """
+    In-process Tesseract via tesserocr: one API handle per thread and page
+    segmentation mode, created once and reused, so language data is loaded
+    once per worker instead of once per call.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang=OCR_LANG):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self._local = threading.local()
+
+    def _api(self, psm, whitelist):
+        # PyTessBaseAPI is not thread-safe; each thread gets its own handles
+        handles = getattr(self._local, "handles", None)
+        if handles is None:
+            handles = self._local.handles = {}
+
+        api = handles.get(psm)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(
+                lang=self.lang, psm=psm, oem=self._tesserocr.OEM.DEFAULT
+            )
+            handles[psm] = api
+
+        # Variables persist on the handle, so always reset the whitelist
+        api.SetVariable("tessedit_char_whitelist", whitelist or "")
+        return api
+
+    def _set_image(self, api, image):
+        gray = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = gray.shape[:2]
+        api.SetImageBytes(gray.tobytes(), width, height, 1, width)
+
+    def image_to_string(self, image, psm=6, whitelist=None):
+        api = self._api(psm, whitelist)
+        self._set_image(api, image)
+        text = api.GetUTF8Text()
+        api.Clear()
+        return text
+
+    def image_to_words(self, image, psm=6):
+        api = self._api(psm, None)
+        self._set_image(api, image)
+        api.Recognize()
+
+        RIL = self._tesserocr.RIL
+        words, line_no = [], 0
+
+        iterator = api.GetIterator()
+        for word in self._tesserocr.iterate_level(iterator, RIL.WORD):
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line_no += 1
+            text = (word.GetUTF8Text(RIL.WORD) or "").strip()
+            if text:
+                words.append((text, max(0.0, float(word.Confidence(RIL.WORD))), line_no))
+
+        api.Clear()
+        return words
+
+
+class PytesseractEngine:
+    """
+    Fallback: shells out to the tesseract binary on every call.
+    """
+
+    name = "pytesseract"
+
+    def __init__(self, lang=OCR_LANG):
+        import pytesseract
+        if TESSERACT_CMD:
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self._pytesseract = pytesseract
+        self.lang = lang
+
+    def _config(self, psm, whitelist):
+        config = f"--oem 3 --psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return config
+
+    def image_to_string(self, image, psm=6, whitelist=None):
+        return self._pytesseract.image_to_string(
+            image, lang=self.lang, config=self._config(psm, whitelist)
+        )
+
+    def image_to_words(self, image, psm=6):
+        data = self._pytesseract.image_to_data(
+            image,
+            lang=self.lang,
+            config=self._config(psm, None),
+            output_type=self._pytesseract.Output.DICT
+        )
+
+        words = []
+        for i, text in enumerate(data["text"]):
+            text = text.strip()
+            if not text:
+                continue
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            words.append((text, max(0.0, float(data["conf"][i])), line_key))
+
+        return words
+
+
+def create_engine(backend=OCR_ENGINE):
+    """
+    OCR_ENGINE=auto (default), tesserocr or pytesseract.
+    """
+    if backend in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine()
+        except ImportError as e:
+            if backend == "tesserocr":
+                raise
+            log.warning("⚠️ tesserocr unavailable (%s): falling back to pytesseract, one tesseract process per OCR call", e)
+    if backend in ("auto", "pytesseract"):
+        return PytesseractEngine()
+
+    raise ValueError(f"Unknown OCR_ENGINE: {backend}")
+
+
+def get_engine():
+    """
+    The process-wide engine, created on first use (OCR pool workers each get their own).
+    """
+    global _engine
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine()
+                log.info("🔤 OCR engine: %s (%s)", _engine.name, _engine.lang)
+
+    return _engine
@@ -1,9 +1,12 @@
 import re
 import cv2
-import pytesseract
+import logging
+import numpy as np
 
-# 🔥 Set this correctly
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+from services.ocr_engine import get_engine
+from utils.verhoeff import validate as verhoeff_validate
+
+log = logging.getLogger(__name__)
 
 
 # ------------------------------------------
@@ -11,7 +14,8 @@ pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tessera
 # ------------------------------------------
 def preprocess_for_ocr(image):
 
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Upload pipeline already hands us grayscale; only convert BGR input
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     gray = cv2.bilateralFilter(gray, 11, 17, 17)
 
@@ -32,32 +36,275 @@ def preprocess_for_ocr(image):
 # ------------------------------------------
 def extract_text_locally(image):
 
-    print("--- 🖥️ Running Tesseract OCR... ---")
-
     processed = preprocess_for_ocr(image)
 
-    text = pytesseract.image_to_string(
-        processed,
-        config='--oem 3 --psm 6'
-    )
+    text = get_engine().image_to_string(processed, psm=6)
 
     clean_text = text.replace('\n', ' ').strip()
 
-    print("✅ Local OCR Output:", clean_text)
+    # OCR text is personal data: only logged when debugging
+    log.debug("✅ Local OCR Output: %s", clean_text)
 
     return clean_text
 
 
+def extract_words_locally(image):
+    """
+    Same Tesseract pass as extract_text_locally, but keeps word boxes:
+    returns [(text, confidence 0-100, line_key)] in reading order.
+    """
+    return get_engine().image_to_words(preprocess_for_ocr(image), psm=6)
+
+
+# ------------------------------------------
+# TEXT LINE LOCALISATION (cheap, no OCR)
+# ------------------------------------------
+def find_text_lines(gray):
+    """
+    Returns (x, y, w, h) boxes of horizontal text lines, bottom-most first.
+    Uses a morphological gradient + horizontal closing so characters merge into lines.
+    """
+    height, width = gray.shape[:2]
+
+    grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # Wide, flat kernel joins the characters (and digit groups) of one line
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(9, width // 40), 1))
+    connected = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, kernel)
+
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    lines = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < height * 0.015 or h > height * 0.12:
+            continue
+        if w < h * 4:
+            continue
+        lines.append((x, y, w, h))
+
+    lines.sort(key=lambda box: box[1], reverse=True)
+    return lines
+
+
+# ------------------------------------------
+# AADHAAR NUMBER (REGION-OF-INTEREST OCR)
+# ------------------------------------------
+# Single text line, digits only
+AADHAAR_ROI_CONFIG = {"psm": 7, "whitelist": "0123456789"}
+
+# Only this many candidate lines are OCR'd before falling back to the full page
+MAX_ROI_LINES = 6
+
+
+def _ocr_line(gray, box, config):
+    """
+    OCRs a single text-line crop (single-line page segmentation).
+    """
+    x, y, w, h = box
+    pad = max(2, h // 4)
+    crop = gray[max(0, y - pad):y + h + pad, max(0, x - pad):x + w + pad]
+
+    # Tesseract prefers ~30px+ glyphs
+    if crop.shape[0] < 40:
+        scale = 40.0 / crop.shape[0]
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+    _, crop = cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    return get_engine().image_to_string(crop, **config).strip()
+
+
+def extract_aadhaar_number_roi(image):
+    """
+    OCRs only the text lines that look like the "XXXX XXXX XXXX" band in the
+    lower half of the card, with a digit whitelist.
+    Returns (number, raw_text) or (None, "") if nothing Verhoeff-valid was found.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    height, width = gray.shape[:2]
+
+    # The number band sits in the lower part of the card and is a medium-width line
+    candidates = [
+        (x, y, w, h) for (x, y, w, h) in find_text_lines(gray)
+        if y > height * 0.45 and width * 0.15 < w < width * 0.9
+    ]
+
+    for box in candidates[:MAX_ROI_LINES]:
+        text = _ocr_line(gray, box, AADHAAR_ROI_CONFIG)
+        digits = re.sub(r'\D', '', text)
+
+        # Exactly 12 digits: a 16-digit VID line is skipped rather than sliced
+        if len(digits) == 12 and verhoeff_validate(digits):
+            return digits, text
+
+    return None, ""
+
+
+# Name, DOB and gender lines sit above the number band; letters only
+NAME_ROI_CONFIG = {"psm": 7, "whitelist": "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.-"}
+MAX_NAME_ROI_LINES = 6
+
+
+def extract_aadhaar_name_text(image):
+    """
+    Name-bearing text for the name match when the number came from ROI OCR:
+    the lines above the number band, or the full page if they hold no letters.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    height, width = gray.shape[:2]
+
+    candidates = [
+        (x, y, w, h) for (x, y, w, h) in find_text_lines(gray)
+        if height * 0.1 < y < height * 0.65 and w > width * 0.1
+    ]
+
+    texts = [_ocr_line(gray, box, NAME_ROI_CONFIG) for box in candidates[:MAX_NAME_ROI_LINES]]
+    text = " ".join(t for t in texts if t)
+
+    if re.search(r'[A-Za-z]{2}', text):
+        return text
+    return extract_text_locally(gray)
+
+
+# ------------------------------------------
+# PAN NUMBER (REGION-OF-INTEREST OCR)
+# ------------------------------------------
+PAN_ROI_CONFIG = {"psm": 7, "whitelist": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"}
+PAN_PATTERN = re.compile(r'[A-Z]{5}[0-9]{4}[A-Z]')
+
+# A PAN card has ~6-8 text lines; the number can be any of them
+MAX_PAN_ROI_LINES = 10
+
+
+def extract_pan_number_roi(image):
+    """
+    Cheap PAN detector: OCRs individual text lines with an A-Z/0-9 whitelist.
+    Returns the PAN number or None.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    width = gray.shape[1]
+
+    candidates = [box for box in find_text_lines(gray) if width * 0.1 < box[2] < width * 0.9]
+
+    for box in candidates[:MAX_PAN_ROI_LINES]:
+        match = PAN_PATTERN.search(_ocr_line(gray, box, PAN_ROI_CONFIG).replace(" ", ""))
+        if match:
+            return match.group(0)
+
+    return None
+
+
+# ------------------------------------------
+# AADHAAR CANDIDATES (full-page fallback)
+# ------------------------------------------
+# Glyphs Tesseract commonly reads instead of a digit on ID cards
+OCR_DIGIT_CONFUSIONS = str.maketrans({
+    "O": "0", "o": "0", "D": "0", "Q": "0",
+    "I": "1", "l": "1", "i": "1", "|": "1", "!": "1",
+    "Z": "2", "z": "2",
+    "S": "5", "s": "5",
+    "G": "6", "b": "6",
+    "T": "7",
+    "B": "8",
+    "g": "9", "q": "9",
+})
+
+# Each substituted glyph costs this much of the window's confidence score
+CONFUSION_PENALTY = 15.0
+
+
+def _digit_runs(words):
+    """
+    Joins consecutive digit-like words of one text line into runs of
+    (digit, confidence, was_substituted) triples. A word counts as digit-like if
+    at least half of it is real digits and the rest maps through OCR_DIGIT_CONFUSIONS,
+    so "S0l2" becomes 5012 while ordinary words ("SOIL", "DOB") break the run.
+    """
+    runs, current, current_line = [], [], None
+
+    for text, conf, line_key in words:
+        token = text.replace("-", "")
+        mapped = token.translate(OCR_DIGIT_CONFUSIONS)
+        real_digits = sum(ch.isdigit() for ch in token)
+
+        digit_like = bool(token) and mapped.isdigit() and real_digits * 2 >= len(token)
+
+        if not digit_like or line_key != current_line:
+            if current:
+                runs.append(current)
+            current = []
+        current_line = line_key
+
+        if digit_like:
+            current.extend(
+                (digit, conf, digit != original) for digit, original in zip(mapped, token)
+            )
+
+    if current:
+        runs.append(current)
+    return runs
+
+
+def aadhaar_candidates(words):
+    """
+    Returns every Verhoeff-valid 12-digit window of the OCR'd words, best first.
+    Ranking: a run of exactly 12 digits (not a slice of a 16-digit VID or merged
+    line) first, then mean word confidence minus a penalty per substituted glyph,
+    then position: later run, then rightmost window within the run (the number
+    sits near the bottom, after any stray digits merged into its line).
+    """
+    scored = []
+
+    for run_index, run in enumerate(_digit_runs(words)):
+        exact = len(run) == 12
+        for start in range(len(run) - 11):
+            window = run[start:start + 12]
+            number = "".join(digit for digit, _, _ in window)
+            if not verhoeff_validate(number):
+                continue
+
+            substitutions = sum(1 for _, _, swapped in window if swapped)
+            score = sum(conf for _, conf, _ in window) / 12 - CONFUSION_PENALTY * substitutions
+            scored.append((exact, score, run_index, start, number))
+
+    scored.sort(reverse=True)
+
+    ranked = []
+    for *_, number in scored:
+        if number not in ranked:
+            ranked.append(number)
+    return ranked
+
+
 # ------------------------------------------
 # AADHAAR EXTRACTION
 # ------------------------------------------
-def extract_aadhaar_text(image):
+def extract_aadhaar_text(image, try_roi=True):
 
-    full_text = extract_text_locally(image)
+    # 1. Fast path: OCR just the number band (callers that already tried it pass try_roi=False)
+    if try_roi:
+        number, roi_text = extract_aadhaar_number_roi(image)
+        if number:
+            log.info("✅ Aadhaar number found via ROI OCR")
+            return {"aadhaar_number": number, "full_text": roi_text,
+                    "name_text": extract_aadhaar_name_text(image)}
+
+    # 2. Fallback: full-page OCR, keeping word confidences for candidate ranking
+    words = extract_words_locally(image)
+    full_text = " ".join(text for text, _, _ in words)
+    log.debug("✅ Local OCR Output: %s", full_text)
 
     if not full_text:
         return {"aadhaar_number": None, "full_text": ""}
 
+    candidates = aadhaar_candidates(words)
+    if candidates:
+        log.info("✅ Aadhaar number chosen from %d Verhoeff-valid candidate(s)", len(candidates))
+        return {"aadhaar_number": candidates[0], "full_text": full_text}
+
+    # No checksum-valid reading: keep the old guess so the mismatch/risk path still sees it
     clean_text = full_text.replace(" ", "").replace("-", "")
 
     matches = re.findall(r'\d{12}', clean_text)
@@ -75,8 +322,16 @@ def extract_aadhaar_text(image):
 # ------------------------------------------
 # PAN EXTRACTION
 # ------------------------------------------
-def extract_pan_text(image):
+def extract_pan_text(image, try_roi=True):
+
+    # 1. Fast path: OCR line by line
+    if try_roi:
+        pan_number = extract_pan_number_roi(image)
+        if pan_number:
+            log.info("✅ PAN number found via ROI OCR")
+            return {"pan_number": pan_number}
 
+    # 2. Fallback: full-page OCR
     full_text = extract_text_locally(image)
 
     if not full_text:
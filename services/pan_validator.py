@@ -1,4 +1,15 @@
 import re
+import numpy as np
+from utils.verhoeff import char_codes
+
+# ^ = Start, $ = End
+# [A-Z]{5} = 5 Letters
+# [0-9]{4} = 4 Digits
+# [A-Z]    = 1 Letter
+PAN_PATTERN = re.compile(r'^[A-Z]{5}[0-9]{4}[A-Z]$')
+
+# Characters str.strip() removes, restricted to ASCII (non-ASCII values use the scalar path)
+_ASCII_WHITESPACE = np.array([9, 10, 11, 12, 13, 28, 29, 30, 31, 32], dtype=np.uint32)
 
 def validate_pan_number(pan_text: str) -> bool:
     """
@@ -16,13 +27,49 @@ def validate_pan_number(pan_text: str) -> bool:
         return False
 
     # 3. Regex Check
-    # ^ = Start, $ = End
-    # [A-Z]{5} = 5 Letters
-    # [0-9]{4} = 4 Digits
-    # [A-Z]    = 1 Letter
-    pattern = r'^[A-Z]{5}[0-9]{4}[A-Z]$'
-    
-    if re.match(pattern, pan):
+    if PAN_PATTERN.match(pan):
         return True
         
-    return False
\ No newline at end of file
+    return False
+
+def validate_pan_numbers(values) -> np.ndarray:
+    """
+    Bulk validate_pan_number over an array / list / pandas column.
+    Checks every character position of every value at once instead of one regex per value.
+    Non-string values are checked as their str() rather than raising like the scalar version.
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=bool)
+
+    values = np.asarray(values)
+    codes = char_codes(values)
+    n, width = codes.shape
+    if width < 10:
+        return np.zeros(n, dtype=bool)
+
+    # Strip: the value must be one 10-char run of non-blank characters
+    blank = np.isin(codes, _ASCII_WHITESPACE)
+    filled = ~blank & (codes != 0)
+    first = filled.argmax(axis=1)
+    last = width - 1 - filled[:, ::-1].argmax(axis=1)
+    length_ok = filled.any(axis=1) & (last - first + 1 == 10)
+
+    # Upper-case ASCII letters, then check letter/digit positions on the 10-char core
+    core = np.take_along_axis(codes, np.minimum(first[:, None] + np.arange(10), width - 1), axis=1)
+    core = np.where((core >= 97) & (core <= 122), core - 32, core)
+    is_letter = (core >= 65) & (core <= 90)
+    is_digit = (core >= 48) & (core <= 57)
+
+    valid = (
+        length_ok
+        & is_letter[:, :5].all(axis=1)
+        & is_digit[:, 5:9].all(axis=1)
+        & is_letter[:, 9]
+    )
+
+    # Non-ASCII values (unicode spaces, letters that upper-case to ASCII) take the scalar path
+    exotic = np.flatnonzero((codes > 127).any(axis=1))
+    for i in exotic:
+        valid[i] = validate_pan_number(str(values[i]) if values[i] is not None else None)
+
+    return valid
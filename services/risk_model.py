@@ -1,19 +1,112 @@
 # services/risk_model.py
-import joblib
 import os
+import hashlib
+import logging
+import threading
 import numpy as np
 
-# Load ML Model if it exists
+from services.compact_forest import CompactForest
+
+log = logging.getLogger(__name__)
+
+# Column order the model was trained on (see ml/train_model.py)
+FEATURE_COLUMNS = ["face_pct", "name_pct", "verhoeff_flag", "blur_score"]
+
+# Input column names for predict_risk_frame (same names as predict_risk arguments)
+INPUT_COLUMNS = ["face_match_score", "name_match_score", "verhoeff_valid", "blur_score"]
+
 model_path = os.path.join(os.path.dirname(__file__), "../ml/risk_model.pkl")
-try:
-    _model = joblib.load(model_path)
-except:
-    _model = None
+compact_model_path = os.path.join(os.path.dirname(__file__), "../ml/risk_model.npz")
+
+# The compact export is memory-mapped read-only, so all workers on a node share
+# its pages through the page cache. RISK_MODEL_MMAP=0 copies it into each worker.
+RISK_MODEL_MMAP = os.environ.get("RISK_MODEL_MMAP", "1") != "0"
+
+
+def _check_schema(features, n_features_in):
+    if list(features) != FEATURE_COLUMNS:
+        raise ValueError(f"Model features {list(features)} != expected {FEATURE_COLUMNS}")
+    if n_features_in != len(FEATURE_COLUMNS):
+        raise ValueError(f"Model takes {n_features_in} features, expected {len(FEATURE_COLUMNS)}")
+
+
+def file_sha256(path):
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def load_sklearn_artifact(path):
+    """
+    Loads ml/risk_model.pkl: either {"model", "features"} (current format) or a
+    bare estimator (older artifacts, assumed to use FEATURE_COLUMNS).
+    """
+    import joblib  # only needed when the compact export is missing or stale
+
+    artifact = joblib.load(path)
+    if isinstance(artifact, dict):
+        model, features = artifact["model"], artifact["features"]
+    else:
+        log.warning("⚠️ %s is a bare estimator without a feature list; re-export it with ml/train_model.py", path)
+        model, features = artifact, FEATURE_COLUMNS
+
+    _check_schema(features, getattr(model, "n_features_in_", len(features)))
+    return model
+
+
+def _load_model():
+    """
+    Prefers the compact NumPy export (no sklearn import) when it was exported
+    from the current .pkl; otherwise loads the .pkl. Returns None if neither is usable.
+    """
+    has_pkl = os.path.exists(model_path)
+
+    if os.path.exists(compact_model_path):
+        try:
+            forest = CompactForest.load(compact_model_path, mmap=RISK_MODEL_MMAP)
+            _check_schema(forest.features, forest.n_features_in_)
+            if has_pkl and forest.source_sha256 != file_sha256(model_path):
+                log.warning("⚠️ ml/risk_model.npz is stale (exported from a different .pkl), ignoring it")
+            else:
+                log.info("✅ Risk model loaded (compact)")
+                return forest
+        except Exception as e:
+            log.error("❌ Compact risk model rejected: %s", e)
+
+    if has_pkl:
+        try:
+            model = load_sklearn_artifact(model_path)
+            log.info("✅ Risk model loaded (sklearn)")
+            return model
+        except Exception as e:
+            log.error("❌ Risk model rejected, using heuristic fallback: %s", e)
+
+    return None
+
+
+# Loaded on first use (or by the app's background warm-up, or in the gunicorn
+# master with preload, see gunicorn.conf.py), not at import time
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_model():
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _model = _load_model()
+                _model_loaded = True
+    return _model
 
 def _to_percent(value):
     # Ensures value is 0-100
     return value * 100 if value <= 1 else value
 
+def _to_percent_array(values):
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(values <= 1, values * 100, values)
+
 def predict_risk(face_match_score, name_match_score, verhoeff_valid, blur_score):
     """
     Calculates Risk Score (0 = Safe, 100 = High Risk)
@@ -23,13 +116,14 @@ def predict_risk(face_match_score, name_match_score, verhoeff_valid, blur_score)
     verhoeff_flag = 1 if verhoeff_valid else 0
 
     # 1. USE ML MODEL IF AVAILABLE
-    if _model is not None:
+    model = get_model()
+    if model is not None:
         try:
             # Predict probability of Fraud (Class 1)
-            prob = _model.predict_proba([[face_pct, name_pct, verhoeff_flag]])[0][1]
+            prob = model.predict_proba([[face_pct, name_pct, verhoeff_flag, blur_score]])[0][1]
             return prob * 100
-        except:
-            pass # Fallback
+        except Exception as e:
+            log.warning("⚠️ Risk model scoring failed, using heuristic: %s", e)
 
     # 2. FALLBACK MANUAL LOGIC
     risk = 50 
@@ -42,4 +136,44 @@ def predict_risk(face_match_score, name_match_score, verhoeff_valid, blur_score)
     if name_pct > 80: risk -= 20
     if face_pct > 80: risk -= 20
     
-    return max(0, min(100, risk))
\ No newline at end of file
+    return max(0, min(100, risk))
+
+def _fallback_risk_batch(face_pct, name_pct, verhoeff_flag, blur_score):
+    # Same rules as the scalar fallback in predict_risk, on whole columns at once
+    risk = np.full(face_pct.shape, 50.0)
+
+    # Penalties
+    risk += np.where(verhoeff_flag == 0, 50, 0)
+    risk += np.where(blur_score < 60, 20, 0)
+
+    # Rewards
+    risk -= np.where(name_pct > 80, 20, 0)
+    risk -= np.where(face_pct > 80, 20, 0)
+
+    return np.clip(risk, 0, 100)
+
+def predict_risk_batch(face_match_scores, name_match_scores, verhoeff_valid, blur_scores):
+    """
+    Vectorised predict_risk: each argument is an equal-length array / column.
+    Scores everything in one predict_proba call and returns an array of risk scores (0-100).
+    """
+    face_pct = _to_percent_array(face_match_scores)
+    name_pct = _to_percent_array(name_match_scores)
+    verhoeff_flag = np.asarray(verhoeff_valid).astype(bool).astype(np.float64)
+    blur_score = np.asarray(blur_scores, dtype=np.float64)
+
+    model = get_model()
+    if model is not None:
+        try:
+            X = np.column_stack([face_pct, name_pct, verhoeff_flag, blur_score])
+            return model.predict_proba(X)[:, 1] * 100
+        except Exception as e:
+            log.warning("⚠️ Risk model batch scoring failed, using heuristic: %s", e)
+
+    return _fallback_risk_batch(face_pct, name_pct, verhoeff_flag, blur_score)
+
+def predict_risk_frame(frame):
+    """
+    predict_risk_batch over a DataFrame with INPUT_COLUMNS.
+    """
+    return predict_risk_batch(*(frame[col].to_numpy() for col in INPUT_COLUMNS))
@@ -0,0 +1,182 @@
+# services/session_store.py
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from services.metrics import timed
+from utils.ttl_cache import TTLCache
+
+# How long an idle KYC session (OCR results, face cache key...) is kept
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", 1800))
+
+# A read pushes a SQLite row's expiry forward only once it is this stale,
+# so polling a job every second does not turn every read into a write
+TTL_REFRESH_SECONDS = 60
+
+
+# ------------------------------------------
+# STORES
+# ------------------------------------------
+class MemoryStateStore:
+    """
+    Single-node store: in-process LRU; entries expire after `ttl_seconds` without a read or write.
+    """
+
+    def __init__(self, max_items=10000, ttl_seconds=SESSION_TTL_SECONDS):
+        self._cache = TTLCache(max_items=max_items, ttl_seconds=ttl_seconds, sliding=True)
+
+    def load(self, sid):
+        data = self._cache.get(sid)
+        return dict(data) if data is not None else None
+
+    def save(self, sid, data):
+        self._cache.set(sid, dict(data))
+
+    def delete(self, sid):
+        self._cache.pop(sid)
+
+
+class SQLiteStateStore:
+    """
+    Multi-worker store: one SQLite file shared by every worker on the node.
+    Several stores (sessions, upload jobs) can share the file, one table each.
+    Like the memory store, rows expire after `ttl_seconds` without a read or write.
+    """
+
+    def __init__(self, path, ttl_seconds=SESSION_TTL_SECONDS, table="kyc_sessions"):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+        self._local = threading.local()
+
+        with self._conn() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _conn(self):
+        # sqlite3 connections must not be shared between threads, nor with a
+        # forked child (the store is created in the gunicorn master with preload)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, sid):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            f"SELECT data, expires_at FROM {self.table} WHERE sid = ? AND expires_at > ?", (sid, now)
+        ).fetchone()
+        if row is None:
+            return None
+
+        if row[1] < now + self.ttl_seconds - TTL_REFRESH_SECONDS:
+            with conn:
+                conn.execute(
+                    f"UPDATE {self.table} SET expires_at = ? WHERE sid = ?", (now + self.ttl_seconds, sid)
+                )
+        return json.loads(row[0])
+
+    def save(self, sid, data):
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (sid, data, expires_at) VALUES (?, ?, ?)",
+                (sid, json.dumps(data), now + self.ttl_seconds)
+            )
+            # Opportunistic cleanup keeps the table small without a cron job
+            conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,))
+
+    def delete(self, sid):
+        with self._conn() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE sid = ?", (sid,))
+
+
+def create_store(table="kyc_sessions", ttl_seconds=SESSION_TTL_SECONDS):
+    """
+    SESSION_BACKEND=memory (default, single worker) or sqlite (SESSION_DB_PATH, multi-worker).
+    """
+    backend = os.environ.get("SESSION_BACKEND", "memory").lower()
+
+    if backend == "sqlite":
+        return SQLiteStateStore(
+            os.environ.get("SESSION_DB_PATH", "kyc_sessions.sqlite3"), ttl_seconds=ttl_seconds, table=table
+        )
+    if backend == "memory":
+        return MemoryStateStore(ttl_seconds=ttl_seconds)
+
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+
+
+# ------------------------------------------
+# FLASK SESSION INTERFACE
+# ------------------------------------------
+class ServerSideSession(CallbackDict, SessionMixin):
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Keeps session data in a state store; the cookie only carries an opaque id.
+    Existing `session[...]` code keeps working unchanged.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            with timed("session_load"):
+                data = self.store.load(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+
+        return ServerSideSession(sid=uuid.uuid4().hex, new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # Unmodified sessions cost nothing on the way out
+        if not session.modified:
+            return
+
+        with timed("session_save"):
+            self.store.save(session.sid, dict(session))
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
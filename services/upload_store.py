@@ -0,0 +1,95 @@
+# services/upload_store.py
+import os
+import logging
+import hashlib
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Uploads are stored by content hash: <root>/ab/cd/<sha256><ext>
+UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", "static/uploads")
+
+ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff"}
+
+# Keep a copy of the original upload on disk (written off the request path)
+PERSIST_UPLOADS = os.environ.get("PERSIST_UPLOADS", "1") != "0"
+
+# One uploaded document, held in memory: what the OCR workers receive
+DocumentUpload = namedtuple("DocumentUpload", ["digest", "ext", "data"])
+
+log = logging.getLogger(__name__)
+
+_persist_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="persist")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sharded_path(digest, suffix):
+    return os.path.join(UPLOAD_FOLDER, digest[:2], digest[2:4], digest + suffix)
+
+
+def face_view_path(digest):
+    """
+    Where the face-sized view of an ID card lives (shared by every upload of that file).
+    """
+    return sharded_path(digest, "_face.jpg")
+
+
+def write_atomic(path, data):
+    """
+    Write + rename so a concurrent reader never sees a half-written file.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # Unique temp name: two threads may write the same digest at once
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        # mkstemp creates 0600; keep the permissions a plain open() would give
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def persist_upload(upload):
+    """
+    Saves the original upload under its content hash; an existing file is never rewritten.
+    """
+    path = sharded_path(upload.digest, upload.ext)
+    if not os.path.exists(path):
+        write_atomic(path, upload.data)
+    return path
+
+
+def _log_persist_failure(future):
+    error = future.exception()
+    if error is not None:
+        log.error("❌ Saving upload failed: %s", error)
+
+
+def ingest_upload(file_storage):
+    """
+    Reads an upload straight from the request stream into one bytes buffer and
+    returns a DocumentUpload. Decoding happens from that buffer (no disk round trip);
+    persisting the original is queued in the background when PERSIST_UPLOADS is on.
+    """
+    ext = os.path.splitext(file_storage.filename or "")[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {ext or 'unknown'}")
+
+    data = file_storage.stream.read()
+    upload = DocumentUpload(content_hash(data), ext, data)
+
+    if PERSIST_UPLOADS:
+        _persist_executor.submit(persist_upload, upload).add_done_callback(_log_persist_failure)
+
+    return upload
@@ -0,0 +1,18 @@
+from services.ocr_service import aadhaar_candidates
+
+REAL = "234567890124"
+
+
+def _line(*texts, conf=90.0, line=1):
+    return [(text, conf, line) for text in texts]
+
+
+def test_rightmost_window_wins_equal_confidence_in_merged_run():
+    # "678234567890" is a Verhoeff-valid window of the same merged run
+    words = _line("1234", "5678", REAL[:4], REAL[4:8], REAL[8:])
+    assert aadhaar_candidates(words)[0] == REAL
+
+
+def test_exact_twelve_digit_run_beats_vid_slice():
+    words = _line(REAL[:4], REAL[4:8], REAL[8:], line=1) + _line("VID", ":", "9012", REAL[:4], REAL[4:8], REAL[8:], line=2)
+    assert aadhaar_candidates(words)[0] == REAL
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from services.face_batcher import FaceBatcher
+
+
+class StubModel:
+    """
+    embed_many stand-in: returns each image's value doubled. Blocks on `gate` so
+    tests can queue several requests while the first forward pass is running.
+    """
+
+    def __init__(self, fail_batches=False, drop=0, bad=()):
+        self.sizes = []
+        self.gate = threading.Event()
+        self.fail_batches = fail_batches
+        self.drop = drop
+        self.bad = set(bad)
+
+    def __call__(self, images):
+        self.sizes.append(len(images))
+        self.gate.wait(5)
+        if self.fail_batches and len(images) > 1:
+            raise ValueError("batch failed")
+        if self.bad & set(images):
+            raise ValueError(f"bad image {images}")
+        return [image * 2 for image in images][:len(images) - self.drop]
+
+
+def _submit_while_busy(model, batcher, images):
+    # The first image occupies the model; the rest queue up behind it
+    first = batcher.submit(images[0])
+    while not model.sizes:
+        pass
+    rest = [batcher.submit(image) for image in images[1:]]
+    model.gate.set()
+    return [first] + rest
+
+
+def test_requests_queued_during_a_pass_share_the_next_batch():
+    model = StubModel()
+    batcher = FaceBatcher(model, max_batch=8, max_wait_ms=0)
+    futures = _submit_while_busy(model, batcher, [1, 2, 3, 4])
+
+    assert [f.result(timeout=5) for f in futures] == [2, 4, 6, 8]
+    assert model.sizes == [1, 3]
+
+
+def test_failed_batch_is_retried_singly():
+    model = StubModel(fail_batches=True, bad={3})
+    batcher = FaceBatcher(model, max_batch=8, max_wait_ms=0)
+    futures = _submit_while_busy(model, batcher, [1, 2, 3, 4])
+
+    assert futures[1].result(timeout=5) == 4
+    assert futures[3].result(timeout=5) == 8
+    with pytest.raises(ValueError, match="bad image"):
+        futures[2].result(timeout=5)
+
+
+def test_single_image_error_reaches_the_caller():
+    model = StubModel(bad={7})
+    model.gate.set()
+    batcher = FaceBatcher(model, max_batch=8, max_wait_ms=0)
+
+    with pytest.raises(ValueError, match="bad image"):
+        batcher.embed(7)
+
+
+def test_short_result_fails_every_future_instead_of_hanging():
+    model = StubModel(drop=1)
+    batcher = FaceBatcher(model, max_batch=8, max_wait_ms=0)
+    futures = _submit_while_busy(model, batcher, [1, 2, 3])
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+
+    # The batcher thread survives and keeps serving
+    model.drop = 0
+    assert batcher.embed(5) == 10
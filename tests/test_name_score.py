@@ -0,0 +1,54 @@
+import os
+
+os.environ.setdefault("FACE_WARMUP", "0")
+
+import cv2
+import numpy as np
+import pytest
+
+import app as kyc_app
+
+# What _analyse_aadhaar stores when the ROI fast path finds the number
+ROI_HIT = {
+    "aadhaar_number": "234567890124",
+    "full_text": "2345 6789 0124",
+    "name_text": "GOVERNMENT OF INDIA RAVI KUMAR SHARMA DOB 01-01-1990 MALE",
+    "page": 0,
+    "blur_score": 250.0,
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    scores = []
+    monkeypatch.setattr(kyc_app, "verify_against_document",
+                        lambda key, path, image: {"match": True, "score": 91.0, "error": None})
+    monkeypatch.setattr(kyc_app, "predict_risk",
+                        lambda face, name, valid, blur: scores.append(name) or 0.1)
+    with kyc_app.app.test_client() as client:
+        client.name_scores = scores
+        yield client
+
+
+def _selfie():
+    _, jpg = cv2.imencode(".jpg", np.full((64, 64, 3), 128, np.uint8))
+    return jpg.tobytes()
+
+
+def test_roi_hit_scores_name_lines(client):
+    with client.session_transaction() as sess:
+        sess["user"] = {"name": "Ravi Kumar Sharma"}
+        sess["ocr_aadhaar"] = ROI_HIT
+        sess["ocr_pan"] = {}
+        sess["doc_path_for_face"] = "unused.jpg"
+
+    response = client.post("/process-face", data=_selfie(), content_type="image/jpeg")
+
+    assert response.status_code == 200
+    assert client.name_scores == [100.0]
+
+
+def test_full_page_result_still_uses_full_text():
+    ocr = {"aadhaar_number": "234567890124", "full_text": "Ravi Kumar Sharma DOB 01/01/1990 2345 6789 0124"}
+    assert kyc_app.name_match_score({"name": "Ravi Kumar Sharma"}, ocr) == 100.0
+    assert kyc_app.name_match_score({"name": "Ravi Kumar Sharma"}, dict(ROI_HIT, name_text="")) < 50
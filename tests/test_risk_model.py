@@ -0,0 +1,46 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from services import risk_model
+from services.risk_model import FEATURE_COLUMNS, load_sklearn_artifact
+
+joblib = pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+
+def _quiet_load(load, path):
+    # The placeholder may have been pickled by another scikit-learn release
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return load(path)
+
+
+def test_shipped_model_carries_its_feature_schema():
+    artifact = _quiet_load(joblib.load, risk_model.model_path)
+
+    assert isinstance(artifact, dict)
+    assert artifact["features"] == FEATURE_COLUMNS
+    assert artifact["model"].n_features_in_ == len(FEATURE_COLUMNS)
+
+
+def test_mismatching_schema_is_rejected(tmp_path):
+    model = _quiet_load(load_sklearn_artifact, risk_model.model_path)
+    path = tmp_path / "swapped.pkl"
+    joblib.dump({"model": model, "features": FEATURE_COLUMNS[::-1]}, path)
+
+    with pytest.raises(ValueError, match="features"):
+        load_sklearn_artifact(path)
+
+
+def test_bare_estimator_still_loads(tmp_path, caplog):
+    model = _quiet_load(load_sklearn_artifact, risk_model.model_path)
+    path = tmp_path / "bare.pkl"
+    joblib.dump(model, path)
+
+    loaded = load_sklearn_artifact(path)
+
+    X = np.array([[90.0, 95.0, 1.0, 150.0]])
+    assert loaded.predict_proba(X).tolist() == model.predict_proba(X).tolist()
+    assert "bare estimator" in caplog.text
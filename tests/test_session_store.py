@@ -0,0 +1,88 @@
+import pytest
+
+from services import session_store
+from services.session_store import MemoryStateStore, SQLiteStateStore
+from utils import ttl_cache
+
+TTL = 1800
+
+
+class FakeClock:
+    """
+    Stands in for the `time` module of the stores: both clocks move only when told.
+    """
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, "time", clock)
+    monkeypatch.setattr(ttl_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryStateStore(ttl_seconds=TTL)
+    return SQLiteStateStore(str(tmp_path / "sessions.sqlite3"), ttl_seconds=TTL)
+
+
+def test_round_trip(store):
+    data = {"user": {"name": "Ravi", "pan": "ABCDE1234F"}, "ocr_aadhaar": {"page": 0, "blur_score": 12.5}}
+    store.save("sid", data)
+
+    assert store.load("sid") == data
+    assert store.load("other") is None
+
+
+def test_load_returns_a_copy(store):
+    store.save("sid", {"step": 1})
+    store.load("sid")["step"] = 2
+
+    assert store.load("sid") == {"step": 1}
+
+
+def test_delete(store):
+    store.save("sid", {"step": 1})
+    store.delete("sid")
+
+    assert store.load("sid") is None
+
+
+def test_idle_session_expires(store, clock):
+    store.save("sid", {"step": 1})
+    clock.now += TTL + 1
+
+    assert store.load("sid") is None
+
+
+def test_read_keeps_session_alive(store, clock):
+    store.save("sid", {"step": 1})
+    clock.now += TTL - 100
+    assert store.load("sid") == {"step": 1}
+
+    # Past the original expiry, but within TTL of the last read
+    clock.now += 200
+    assert store.load("sid") == {"step": 1}
+
+    clock.now += TTL + 1
+    assert store.load("sid") is None
+
+
+def test_save_restarts_ttl(store, clock):
+    store.save("sid", {"step": 1})
+    clock.now += TTL - 10
+    store.save("sid", {"step": 2})
+    clock.now += TTL - 10
+
+    assert store.load("sid") == {"step": 2}
@@ -0,0 +1,103 @@
+"""
+The bulk validators must agree with their scalar versions on every input.
+Where a scalar version raises (it only takes strings), the bulk one checks str(value).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.verhoeff import validate, validate_many, generate
+from services.aadhaar_validator import validate_aadhaar_number, validate_aadhaar_numbers
+from services.pan_validator import validate_pan_number, validate_pan_numbers
+
+VALID_AADHAAR = "234567890124"
+VALID_AADHAAR_INT = int(VALID_AADHAAR)
+assert validate(VALID_AADHAAR)
+
+EDGE_VALUES = [
+    None, float("nan"), 0, 1, 5, 123, 234567890124, -234567890124, 12.0, True, False,
+    "", " ", "0", "00", "5", "\t5\n", VALID_AADHAAR, " " + VALID_AADHAAR, VALID_AADHAAR + " ",
+    "2345 6789 0124", "2345-6789-0124", "٢٣٤٥٦٧٨٩٠١٢٤", "２３４５６７８９０１２４", "²³", "٣",
+    "ABCDE1234F", "abcde1234f", " ABCDE1234F ", " ABCDE1234F", "ABCDE1234F　",
+    "ABCDE１２３４F", "ABCDＥ1234F", "ﬃBCDE1234F", "ßBCD1234F", "ABCDE12345", "ABCD1234F",
+]
+
+SCALAR_BULK = [
+    ("verhoeff", validate, validate_many),
+    ("aadhaar", validate_aadhaar_number, validate_aadhaar_numbers),
+    ("pan", validate_pan_number, validate_pan_numbers),
+]
+
+
+def _reference(scalar, value):
+    """
+    What the bulk path promises for one value.
+    """
+    try:
+        return scalar(value)
+    except (TypeError, AttributeError):
+        # The Aadhaar / PAN scalars take strings only: ints, floats, NaN are checked as str()
+        return _reference(scalar, str(value))
+    except ValueError:
+        # validate("²"): isdigit() accepts it, int() does not
+        return False
+
+
+def _fuzz_values(count, seed=0):
+    """
+    Digit / PAN-shaped strings mixed with separators, whitespace and non-ASCII
+    look-alikes, plus real Aadhaar numbers so the valid branch is exercised.
+    """
+    rng = np.random.default_rng(seed)
+    alphabet = list("0123456789 -ABCDEFabcdef\t") + ["٣", "７", "²", " ", "Ｚ", "ß", "　"]
+    values = []
+    for i in range(count):
+        if i % 4 == 0:
+            body = "".join(str(x) for x in rng.integers(0, 10, size=11))
+            values.append(body + generate(body))
+        else:
+            values.append("".join(rng.choice(alphabet, size=rng.integers(0, 16))))
+    return values
+
+
+@pytest.mark.parametrize("name, scalar, bulk", SCALAR_BULK)
+def test_edge_values_match_scalar(name, scalar, bulk):
+    expected = [_reference(scalar, v) for v in EDGE_VALUES]
+    assert list(bulk(np.array(EDGE_VALUES, dtype=object))) == expected
+
+
+@pytest.mark.parametrize("name, scalar, bulk", SCALAR_BULK)
+def test_fuzz_matches_scalar(name, scalar, bulk):
+    values = _fuzz_values(5000)
+    expected = np.array([_reference(scalar, v) for v in values])
+    got = bulk(values)
+    mismatches = [values[i] for i in np.flatnonzero(got != expected)]
+    assert not mismatches, mismatches[:10]
+
+
+@pytest.mark.parametrize("name, scalar, bulk", SCALAR_BULK)
+def test_pandas_columns(name, scalar, bulk):
+    strings = pd.Series([VALID_AADHAAR, None, "ABCDE1234F", "", "٣"], dtype=object)
+    assert list(bulk(strings)) == [_reference(scalar, v) for v in strings]
+
+
+def test_int_columns():
+    ints = np.array([0, 5, 234567890124, 234567890125])
+    assert list(validate_many(ints)) == [validate(int(v)) for v in ints]
+    assert list(validate_aadhaar_numbers(ints)) == [validate_aadhaar_number(str(v)) for v in ints]
+
+
+def test_scalar_semantics_unchanged():
+    # The scalar validators are used on the request path and keep their original behaviour
+    with pytest.raises(ValueError):
+        validate("²³")
+    with pytest.raises(TypeError):
+        validate_aadhaar_number(VALID_AADHAAR_INT)
+    with pytest.raises(AttributeError):
+        validate_pan_number(1234)
+    assert validate(int(VALID_AADHAAR))
+
+
+@pytest.mark.parametrize("name, scalar, bulk", SCALAR_BULK)
+def test_empty_input(name, scalar, bulk):
+    assert bulk([]).shape == (0,)
@@ -0,0 +1,43 @@
+# utils/request_log.py
+import os
+import uuid
+import logging
+import contextvars
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+# Request id of the request (or OCR job) being handled by this thread/task
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps every record with the current request id.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+def configure_logging(level=LOG_LEVEL):
+    """
+    Idempotent root-logger setup, also called in OCR worker processes.
+    """
+    root = logging.getLogger()
+    if any(getattr(handler, "_kyc_handler", False) for handler in root.handlers):
+        return
+
+    handler = logging.StreamHandler()
+    handler._kyc_handler = True
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(RequestIdFilter())
+
+    root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,54 @@
+# utils/ttl_cache.py
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache where every entry also expires after `ttl_seconds`.
+    With sliding=True every hit restarts the entry's TTL (idle expiry).
+    """
+
+    def __init__(self, max_items=1024, ttl_seconds=900, sliding=False):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.sliding = sliding
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            now = time.monotonic()
+            if expires_at < now:
+                del self._data[key]
+                return default
+
+            if self.sliding:
+                self._data[key] = (now + self.ttl_seconds, value)
+
+            # Mark as most recently used
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+
+            # Evict least recently used entries beyond capacity
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def __len__(self):
+        return len(self._data)
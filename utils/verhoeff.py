@@ -1,4 +1,7 @@
 # utils/verhoeff.py
+import numbers
+
+import numpy as np
 
 # Multiplication table
 d = [
@@ -27,4 +30,99 @@ def validate(number):
     for i, n in enumerate(inverted_number):
         c = d[c][p[i % 8][int(n)]]
         
-    return c == 0
\ No newline at end of file
+    return c == 0
+
+# Inverse table
+inv = [0, 4, 3, 2, 1, 5, 6, 7, 8, 9]
+
+def generate(number):
+    """
+    Returns the Verhoeff check digit for `number` (digits only), so that
+    str(number) + generate(number) passes validate(). Used for test data.
+    """
+    c = 0
+    for i, n in enumerate(reversed(str(number))):
+        c = d[c][p[(i + 1) % 8][int(n)]]
+
+    return str(inv[c])
+
+# ------------------------------------------
+# BULK (VECTORISED) VALIDATION
+# ------------------------------------------
+# Same tables as NumPy arrays, for lookups over whole columns
+D_TABLE = np.array(d, dtype=np.uint8)
+P_TABLE = np.array(p, dtype=np.uint8)
+
+
+def char_codes(values):
+    """
+    Turns a sequence of strings into an (n, width) uint32 array of code points.
+    Shorter strings are padded with 0 on the right.
+    """
+    arr = np.asarray(values).astype(str)
+    width = max(arr.dtype.itemsize // 4, 1)
+    arr = arr.astype(f"U{width}")
+    return arr.view(np.uint32).reshape(len(arr), width)
+
+
+def validate_codes(codes):
+    """
+    Verhoeff check over an (n, width) code-point array (see char_codes).
+    Returns a boolean array; rows that are empty or contain a non-digit are False.
+    """
+    n, width = codes.shape
+    lengths = (codes != 0).sum(axis=1)
+    is_digit = (codes >= 48) & (codes <= 57)
+    all_digits = (is_digit | (codes == 0)).all(axis=1) & (lengths > 0)
+
+    digits = np.where(is_digit, codes - 48, 0).astype(np.intp)
+    rows = np.arange(n)
+    c = np.zeros(n, dtype=np.intp)
+
+    # Position i counts from the right end of each (left-aligned) string
+    for i in range(width):
+        j = lengths - 1 - i
+        in_range = j >= 0
+        digit = digits[rows, np.maximum(j, 0)]
+        c = np.where(in_range, D_TABLE[c, P_TABLE[i % 8, digit]], c)
+
+    return all_digits & (c == 0)
+
+
+def _falsy(values):
+    """
+    Elements validate() rejects up front (None, 0, ""), which char_codes would
+    otherwise turn into "None" / "0".
+    """
+    kind = values.dtype.kind
+    if kind in "biuf":
+        return values == 0
+    if kind == "O":
+        return np.fromiter(
+            (v is None or (isinstance(v, numbers.Number) and v == 0) for v in values),
+            dtype=bool, count=len(values)
+        )
+    return np.zeros(len(values), dtype=bool)
+
+
+def validate_many(numbers):
+    """
+    Vectorised validate(): takes an array / list / pandas column of numbers
+    (strings or ints) and returns a boolean NumPy array in one pass.
+    """
+    if len(numbers) == 0:
+        return np.zeros(0, dtype=bool)
+
+    values = np.asarray(numbers)
+    codes = char_codes(values)
+    valid = validate_codes(codes) & ~_falsy(values)
+
+    # Non-ASCII values (e.g. other scripts' digits, which validate() accepts) take the scalar path
+    for i in np.flatnonzero((codes > 127).any(axis=1)):
+        try:
+            valid[i] = validate(values[i])
+        except ValueError:
+            # isdigit() digits int() cannot parse (superscripts like "²") are invalid here
+            valid[i] = False
+
+    return valid